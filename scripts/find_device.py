@@ -4,6 +4,7 @@ Device Finder Script
 Find devices on network by MAC address with multiple scanning methods.
 """
 
+import os
 import subprocess
 import sys
 import time
@@ -11,7 +12,60 @@ import argparse
 import ipaddress
 import concurrent.futures
 import re
-from typing import List, Dict, Optional
+import select
+import socket
+import struct
+import threading
+from bisect import bisect_right
+from typing import Callable, List, Dict, Optional, Set
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+
+# Netlink neighbour table constants (linux/netlink.h, linux/neighbour.h)
+RTM_NEWNEIGH = 28
+RTM_GETNEIGH = 30
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x001
+NLM_F_DUMP = 0x300
+NDA_DST = 1
+NDA_LLADDR = 2
+NUD_INCOMPLETE = 0x01
+NUD_FAILED = 0x20
+NUD_NOARP = 0x40
+RTMGRP_NEIGH = 0x4
+
+NLMSG_HEADER = struct.Struct('=IHHII')
+NDMSG = struct.Struct('=BBHiHBB')
+RTATTR = struct.Struct('=HH')
+ICMP_ECHO = struct.Struct('!BBHHH')
+
+IPV4_PATTERN = rb'\d+\.\d+\.\d+\.\d+'
+MAC_PATTERN = rb'(?:[0-9a-fA-F]{2}[:-]){5}[0-9a-fA-F]{2}'
+
+# Single pass over arp/ip neigh output: IPs, MACs and line breaks
+_ARP_RE = re.compile(
+    f"(?P<ip>{IPV4_PATTERN.decode()})|(?P<mac>{MAC_PATTERN.decode()})|(?P<nl>\n)"
+)
+
+# How long to keep listening for the target's neighbour entry after a sweep
+NEIGH_WAIT_TIMEOUT = 3.0
+
+# Worker threads for the subprocess ping fallback, shared across networks
+PING_WORKERS = 256
+
+# Large enough to hold a full /24 burst of requests and replies
+ICMP_SOCKET_BUFFER = 256 * 1024
+
+# Reused for every reply: IPv4 header (up to 60 bytes) plus the echo header
+ICMP_RECV_SIZE = 128
 
 
 def run_command(command: List[str], timeout: int = 10) -> tuple:
@@ -31,8 +85,42 @@ def run_command(command: List[str], timeout: int = 10) -> tuple:
         return False, "", str(e)
 
 
+def _read_proc_routes() -> Optional[List[str]]:
+    """Read directly connected IPv4 networks from /proc/net/route.
+
+    Returns:
+        Networks in CIDR notation, or None if procfs is not available
+    """
+    try:
+        with open('/proc/net/route') as f:
+            lines = f.read().splitlines()[1:]
+    except OSError:
+        return None
+    
+    networks = []
+    for line in lines:
+        cols = line.split()
+        if len(cols) < 8:
+            continue
+        destination = int(cols[1], 16)
+        if destination == 0:
+            continue  # default route
+        
+        # Addresses are stored as host-endian (little-endian) hex
+        address = socket.inet_ntoa(struct.pack('<I', destination))
+        prefix = bin(int(cols[7], 16)).count('1')
+        if not address.startswith('169.254'):
+            networks.append(f"{address}/{prefix}")
+    
+    return networks
+
+
 def get_network_interfaces() -> List[str]:
     """Get list of active network interfaces."""
+    networks = _read_proc_routes()
+    if networks is not None:
+        return list(dict.fromkeys(networks))
+    
     success, output, _ = run_command(['ip', 'route', 'show'])
     if not success:
         return []
@@ -43,14 +131,57 @@ def get_network_interfaces() -> List[str]:
             # Extract network from routes like "192.168.1.0/24 dev wlan0"
             parts = line.split()
             for part in parts:
-                if '/' in part and not part.startswith('169.254'):
+                # Only CIDR-looking tokens are worth validating
+                if '/' in part and part[0].isdigit() and not part.startswith('169.254'):
                     try:
                         network = ipaddress.IPv4Network(part, strict=False)
                         networks.append(str(network))
-                    except:
+                    except ValueError:
                         pass
     
-    return list(set(networks))
+    # Deduplicate but keep route table order so scans are reproducible
+    return list(dict.fromkeys(networks))
+
+
+def _mac_to_int(mac: str) -> Optional[int]:
+    """Parse a colon- or dash-separated MAC address into a 48-bit integer.
+
+    Returns:
+        MAC as an integer, or None if the string is not a valid MAC
+    """
+    digits = mac.replace(':', '').replace('-', '')
+    if len(digits) != 12:
+        return None
+    try:
+        return int(digits, 16)
+    except ValueError:
+        return None
+
+
+def _format_mac(mac: int) -> str:
+    """Format a 48-bit integer MAC as lowercase colon-separated hex."""
+    return ':'.join(f'{b:02x}' for b in mac.to_bytes(6, 'big'))
+
+
+_OCTETS = [str(i) for i in range(256)]
+
+
+def _network_hosts(net: ipaddress.IPv4Network) -> List[str]:
+    """List the usable host addresses of a network as dotted-quad strings.
+
+    Works on the integer range directly instead of building an
+    IPv4Address object per host.
+    """
+    first = int(net.network_address)
+    last = int(net.broadcast_address)
+    if net.prefixlen >= 31:
+        addresses = range(first, last + 1)
+    else:
+        addresses = range(first + 1, last)
+    
+    octets = _OCTETS
+    return [f"{octets[a >> 24]}.{octets[(a >> 16) & 0xFF]}.{octets[(a >> 8) & 0xFF]}.{octets[a & 0xFF]}"
+            for a in addresses]
 
 
 def ping_host(ip: str) -> bool:
@@ -59,23 +190,176 @@ def ping_host(ip: str) -> bool:
     return success
 
 
-def scan_network_ping(network: str) -> None:
-    """Scan network using ping method."""
+def _pack_icmp_echo(buffer: bytearray, seq: int, ident: int = 0) -> None:
+    """Write an 8-byte ICMP echo request header into `buffer` in place.
+
+    The header has no payload, so the checksum is folded directly from its
+    three non-zero words instead of summing a freshly packed message.
+    """
+    total = (ICMP_ECHO_REQUEST << 8) + ident + seq
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    ICMP_ECHO.pack_into(buffer, 0, ICMP_ECHO_REQUEST, 0, ~total & 0xFFFF, ident, seq)
+
+
+def _build_icmp_echo(seq: int, ident: int = 0) -> bytes:
+    """Build an 8-byte ICMP echo request header with the given sequence number.
+
+    Datagram sockets on Linux overwrite the identifier, raw sockets keep it.
+    """
+    packet = bytearray(ICMP_ECHO.size)
+    _pack_icmp_echo(packet, seq, ident)
+    return bytes(packet)
+
+
+def _parse_icmp_reply(data: memoryview) -> Optional[int]:
+    """Return the sequence number of an ICMP echo reply, or None.
+
+    Raw sockets and macOS datagram sockets deliver the IPv4 header in
+    front of the ICMP message, Linux datagram sockets do not.
+    """
+    if data and data[0] >> 4 == 4:
+        data = data[(data[0] & 0x0F) * 4:]
+    if len(data) < 8 or data[0] != ICMP_ECHO_REPLY:
+        return None
+    return struct.unpack_from('!H', data, 6)[0]
+
+
+def _open_icmp_socket() -> Optional[socket.socket]:
+    """Open an ICMP socket, or None if neither kind is permitted.
+
+    Unprivileged datagram sockets are tried first (macOS allows them by
+    default, Linux only for groups listed in net.ipv4.ping_group_range),
+    then raw sockets, which need root or administrator rights.
+    """
+    for sock_type in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+        try:
+            sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+            break
+        except OSError:
+            continue
+    else:
+        return None
+    
+    # Size the buffers so the whole sweep is queued without blocking on send
+    # and replies arriving in a burst are not dropped before being read
+    for option in (socket.SO_SNDBUF, socket.SO_RCVBUF):
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, option, ICMP_SOCKET_BUFFER)
+        except OSError:
+            pass
+    
+    sock.setblocking(False)
+    return sock
+
+
+def _ping_sweep(hosts: List[str], timeout: float = 1.0,
+                on_reply: Optional[Callable[[str], None]] = None,
+                found: Optional[threading.Event] = None) -> Optional[Set[str]]:
+    """Ping all hosts from a single ICMP socket in one process.
+
+    Every echo request is sent up front, then replies are collected until
+    all hosts have answered, the timeout expires or `found` is set.
+
+    Args:
+        hosts: IP addresses to probe
+        timeout: Seconds to wait for replies after the last request
+        on_reply: Called with each responding IP as its reply arrives
+        found: Event that stops the sweep early once set
+
+    Returns:
+        Set of responding IPs, or None if ICMP sockets are unavailable
+    """
+    sock = _open_icmp_socket()
+    if sock is None:
+        return None
+
+    # One socket receives every reply, so map sequence numbers back to the
+    # probed address; this also drops stray ICMP seen by raw sockets
+    pending = {}
+    responders = set()
+    ident = os.getpid() & 0xFFFF
+    
+    # Allocate the request and reply buffers once and rewrite them in place
+    packet = bytearray(ICMP_ECHO.size)
+    reply = bytearray(ICMP_RECV_SIZE)
+    reply_view = memoryview(reply)
+    with sock:
+        for seq, ip in enumerate(hosts):
+            if found is not None and found.is_set():
+                return responders
+            seq &= 0xFFFF
+            pending[seq] = ip
+            _pack_icmp_echo(packet, seq, ident)
+            while True:
+                try:
+                    sock.sendto(packet, (ip, 0))
+                    break
+                except BlockingIOError:
+                    select.select([], [sock], [], timeout)
+                except OSError:
+                    break
+
+        deadline = time.monotonic() + timeout
+        while len(responders) < len(hosts):
+            if found is not None and found.is_set():
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ready, _, _ = select.select([sock], [], [], remaining)
+            if not ready:
+                break
+            
+            # Replies arrive in bursts, so drain everything queued on the
+            # socket before going back to select()
+            while True:
+                try:
+                    size, addr = sock.recvfrom_into(reply)
+                except (BlockingIOError, InterruptedError):
+                    break
+                seq = _parse_icmp_reply(reply_view[:size])
+                if seq is not None and pending.get(seq) == addr[0] and addr[0] not in responders:
+                    responders.add(addr[0])
+                    if on_reply:
+                        on_reply(addr[0])
+
+    return responders
+
+
+def scan_network_ping(network: str, executor: concurrent.futures.Executor,
+                      on_reply: Optional[Callable[[str], None]] = None,
+                      found: Optional[threading.Event] = None) -> None:
+    """Scan network using ping method, stopping early once `found` is set.
+
+    The executor is only used by the subprocess fallback and is shared
+    between networks so its worker threads are reused.
+    """
     print(f"🔍 Scanning {network} with ping...")
     
     try:
         net = ipaddress.IPv4Network(network)
-        hosts = list(net.hosts())
+        hosts = _network_hosts(net)
         
-        # Use ThreadPoolExecutor for concurrent pinging
-        with concurrent.futures.ThreadPoolExecutor(max_workers=50) as executor:
-            futures = {executor.submit(ping_host, str(ip)): ip for ip in hosts}
-            
-            completed = 0
-            for future in concurrent.futures.as_completed(futures):
-                completed += 1
-                if completed % 50 == 0:
-                    print(f"   Scanned {completed}/{len(hosts)} hosts...")
+        responders = _ping_sweep(hosts, on_reply=on_reply, found=found)
+        if responders is not None:
+            print(f"   {len(responders)}/{len(hosts)} hosts responded")
+            return
+        
+        # ICMP sockets not permitted, fall back to the ping binary
+        futures = {executor.submit(ping_host, ip): ip for ip in hosts}
+        
+        completed = 0
+        for future in concurrent.futures.as_completed(futures):
+            completed += 1
+            if future.result() and on_reply:
+                on_reply(futures[future])
+            if found is not None and found.is_set():
+                for pending in futures:
+                    pending.cancel()
+                break
+            if completed % 50 == 0:
+                print(f"   Scanned {completed}/{len(hosts)} hosts...")
                     
     except Exception as e:
         print(f"❌ Error scanning {network}: {e}")
@@ -100,37 +384,241 @@ def scan_with_nmap(network: str) -> Optional[str]:
         return None
 
 
-def get_arp_table() -> Dict[str, str]:
-    """Get current ARP table as IP -> MAC mapping."""
+def _parse_neigh_message(message: bytes, offset: int, end: int) -> Optional[tuple]:
+    """Extract (ip, mac) from one RTM_NEWNEIGH message, or None if unusable."""
+    family, _, _, _, state, _, _ = NDMSG.unpack_from(message, offset)
+    if family != socket.AF_INET or state & (NUD_INCOMPLETE | NUD_FAILED | NUD_NOARP):
+        return None
+    
+    ip = mac = None
+    offset += NDMSG.size
+    while offset + RTATTR.size <= end:
+        attr_len, attr_type = RTATTR.unpack_from(message, offset)
+        if attr_len < RTATTR.size:
+            break
+        value = message[offset + RTATTR.size:offset + attr_len]
+        if attr_type == NDA_DST and len(value) == 4:
+            ip = socket.inet_ntop(socket.AF_INET, value)
+        elif attr_type == NDA_LLADDR and len(value) == 6:
+            mac = int.from_bytes(value, 'big')
+        offset += (attr_len + 3) & ~3
+    
+    if ip is None or mac is None:
+        return None
+    return ip, mac
+
+
+def _iter_netlink_messages(data: bytes):
+    """Yield (type, payload offset, end offset) for each netlink message in data."""
+    offset = 0
+    while offset + NLMSG_HEADER.size <= len(data):
+        msg_len, msg_type, _, _, _ = NLMSG_HEADER.unpack_from(data, offset)
+        if msg_len < NLMSG_HEADER.size:
+            return
+        yield msg_type, offset + NLMSG_HEADER.size, offset + msg_len
+        offset += (msg_len + 3) & ~3
+
+
+def _read_neigh_netlink() -> Optional[Dict[str, int]]:
+    """Dump the kernel IPv4 neighbour table over NETLINK_ROUTE.
+
+    Returns:
+        IP -> integer MAC mapping, or None if netlink is unavailable
+    """
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+    except (AttributeError, OSError):
+        return None
+    
+    request = NDMSG.pack(socket.AF_INET, 0, 0, 0, 0, 0, 0)
+    header = NLMSG_HEADER.pack(NLMSG_HEADER.size + len(request), RTM_GETNEIGH,
+                               NLM_F_REQUEST | NLM_F_DUMP, 1, 0)
+    
+    arp_table = {}
+    with sock:
+        try:
+            sock.sendall(header + request)
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    return arp_table
+                for msg_type, offset, end in _iter_netlink_messages(data):
+                    if msg_type == NLMSG_DONE:
+                        return arp_table
+                    if msg_type == NLMSG_ERROR:
+                        return None
+                    if msg_type == RTM_NEWNEIGH:
+                        entry = _parse_neigh_message(data, offset, end)
+                        if entry:
+                            arp_table[entry[0]] = entry[1]
+        except OSError:
+            return None
+
+
+def _read_proc_arp() -> Optional[Dict[str, int]]:
+    """Read the IPv4 ARP cache from /proc/net/arp.
+
+    Returns:
+        IP -> integer MAC mapping, or None if procfs is not available
+    """
+    try:
+        with open('/proc/net/arp') as f:
+            lines = f.read().splitlines()[1:]
+    except OSError:
+        return None
+    
+    # Columns: IP address, HW type, Flags, HW address, Mask, Device
+    arp_table = {}
+    for line in lines:
+        cols = line.split()
+        if len(cols) < 4 or int(cols[2], 16) == 0:
+            continue  # incomplete entry
+        mac = _mac_to_int(cols[3])
+        if mac:
+            arp_table[cols[0]] = mac
+    
+    return arp_table
+
+
+def _open_neigh_monitor() -> Optional[socket.socket]:
+    """Subscribe to kernel neighbour table changes (RTMGRP_NEIGH), or None."""
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+    except (AttributeError, OSError):
+        return None
+    
+    try:
+        sock.bind((0, RTMGRP_NEIGH))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _watch_neighbours(sock: socket.socket, target_mac: int, found: threading.Event,
+                      found_ips: List[str], done: threading.Event):
+    """Set `found` as soon as the kernel reports a neighbour entry for target_mac.
+
+    Runs until the target is seen or `done` is set, then closes the socket.
+    """
+    with sock:
+        while not done.is_set():
+            ready, _, _ = select.select([sock], [], [], 0.1)
+            if not ready:
+                continue
+            try:
+                data = sock.recv(65536)
+            except OSError:
+                return
+            for msg_type, offset, end in _iter_netlink_messages(data):
+                if msg_type != RTM_NEWNEIGH:
+                    continue
+                entry = _parse_neigh_message(data, offset, end)
+                if entry and entry[1] == target_mac:
+                    found_ips.append(entry[0])
+                    found.set()
+                    return
+
+
+_hyperscan_db = None
+
+
+def _get_hyperscan_db():
+    """Compile the IPv4/MAC/newline Hyperscan database once and cache it."""
+    global _hyperscan_db
+    if _hyperscan_db is None:
+        db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        db.compile(
+            expressions=[IPV4_PATTERN, MAC_PATTERN, rb'\n'],
+            ids=[0, 1, 2],
+            elements=3,
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * 3
+        )
+        _hyperscan_db = db
+    return _hyperscan_db
+
+
+def _parse_arp_output_hyperscan(output: str) -> Dict[str, int]:
+    """Parse arp/ip neigh output with a single Hyperscan pass over the buffer."""
+    buf = output.encode()
+    spans = ({}, {})  # pattern id -> {start: longest end}
+    newlines = []
+    
+    def on_match(pattern_id, start, end, flags, context):
+        if pattern_id == 2:
+            newlines.append(start)
+        elif end > spans[pattern_id].get(start, -1):
+            spans[pattern_id][start] = end
+    
+    _get_hyperscan_db().scan(buf, match_event_handler=on_match)
+    newlines.sort()
+    
+    # Keep the leftmost IP and MAC match on each line
+    first_per_line = ({}, {})
+    for pattern_id in (0, 1):
+        for start in sorted(spans[pattern_id]):
+            line_no = bisect_right(newlines, start)
+            first_per_line[pattern_id].setdefault(line_no, (start, spans[pattern_id][start]))
+    
+    arp_table = {}
+    for line_no, (ip_start, ip_end) in first_per_line[0].items():
+        mac_span = first_per_line[1].get(line_no)
+        if mac_span:
+            ip = buf[ip_start:ip_end].decode()
+            arp_table[ip] = _mac_to_int(buf[mac_span[0]:mac_span[1]].decode())
+    
+    return arp_table
+
+
+def _parse_arp_output(output: str) -> Dict[str, int]:
+    """Parse arp/ip neigh output into IP -> MAC, using Hyperscan when installed."""
+    if hyperscan is not None:
+        return _parse_arp_output_hyperscan(output)
+    
+    # Keep the first IP and MAC seen on each line
+    arp_table = {}
+    ip = mac = None
+    for match in _ARP_RE.finditer(output + '\n'):
+        kind = match.lastgroup
+        if kind == 'nl':
+            if ip and mac is not None:
+                arp_table[ip] = mac
+            ip = mac = None
+        elif kind == 'ip':
+            if ip is None:
+                ip = match.group()
+        elif mac is None:
+            mac = _mac_to_int(match.group())
+    
+    return arp_table
+
+
+def get_arp_table() -> Dict[str, int]:
+    """Get current ARP table as IP -> MAC mapping, with MACs as 48-bit integers."""
+    if sys.platform.startswith('linux'):
+        arp_table = _read_neigh_netlink()
+        if arp_table is not None:
+            return arp_table
+        
+        arp_table = _read_proc_arp()
+        if arp_table is not None:
+            return arp_table
+    
     arp_table = {}
     
     # Try different ARP commands
     for cmd in [['arp', '-a'], ['ip', 'neigh', 'show']]:
         success, output, _ = run_command(cmd)
         if success:
-            for line in output.split('\n'):
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Parse different ARP output formats
-                ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', line)
-                mac_match = re.search(r'([0-9a-fA-F]{2}[:-]){5}[0-9a-fA-F]{2}', line)
-                
-                if ip_match and mac_match:
-                    ip = ip_match.group(1)
-                    mac = mac_match.group(0).lower().replace('-', ':')
-                    arp_table[ip] = mac
-            
+            arp_table = _parse_arp_output(output)
             if arp_table:
                 break
     
     return arp_table
 
 
-def find_mac_in_arp(target_mac: str) -> List[str]:
+def find_mac_in_arp(target_mac: int) -> List[str]:
     """Find IP addresses associated with target MAC address."""
-    target_mac = target_mac.lower().replace('-', ':')
     arp_table = get_arp_table()
     
     found_ips = []
@@ -141,15 +629,52 @@ def find_mac_in_arp(target_mac: str) -> List[str]:
     return found_ips
 
 
-def scan_specific_network(network: str, target_mac: str) -> List[str]:
-    """Scan a specific network for target MAC."""
+def scan_specific_network(network: str, target_mac: int,
+                          executor: concurrent.futures.Executor,
+                          use_nmap: bool = False) -> List[str]:
+    """Scan a specific network for target MAC.
+
+    The in-process ping sweep already does host discovery; nmap only runs
+    on request since it repeats the same probes in a separate process.
+    """
     print(f"\n🎯 Scanning network: {network}")
     
-    # First try nmap scan
-    nmap_output = scan_with_nmap(network)
+    if use_nmap:
+        nmap_output = scan_with_nmap(network)
+        if nmap_output:
+            print(nmap_output)
     
-    # Then do ping scan
-    scan_network_ping(network)
+    found = threading.Event()
+    found_ips = []
+    
+    # Listen for the target's neighbour entry while probing so we can
+    # return the moment it resolves instead of sleeping a fixed interval
+    monitor = _open_neigh_monitor()
+    if monitor is not None:
+        done = threading.Event()
+        watcher = threading.Thread(
+            target=_watch_neighbours,
+            args=(monitor, target_mac, found, found_ips, done),
+            daemon=True
+        )
+        watcher.start()
+        
+        scan_network_ping(network, executor, found=found)
+        found.wait(NEIGH_WAIT_TIMEOUT)
+        
+        done.set()
+        watcher.join()
+        return found_ips if found.is_set() else find_mac_in_arp(target_mac)
+    
+    # No netlink, so check each reply against the ARP table instead
+    def check_reply(ip: str):
+        if get_arp_table().get(ip) == target_mac:
+            found_ips.append(ip)
+            found.set()
+    
+    scan_network_ping(network, executor, on_reply=check_reply, found=found)
+    if found.is_set():
+        return found_ips
     
     # Wait a bit for ARP table to populate
     time.sleep(2)
@@ -166,14 +691,18 @@ def main():
     parser.add_argument('mac', help='MAC address to find (e.g., 2c:cf:67:87:6a:d5)')
     parser.add_argument('-n', '--network', help='Specific network to scan (e.g., 192.168.1.0/24)')
     parser.add_argument('--all-networks', action='store_true', help='Scan all detected networks')
+    parser.add_argument('--use-nmap', action='store_true', help='Also run an nmap scan on each network')
     
     args = parser.parse_args()
     
-    target_mac = args.mac.lower().replace('-', ':')
+    target_mac = _mac_to_int(args.mac)
+    if target_mac is None:
+        print(f"❌ Invalid MAC address: {args.mac}")
+        return 1
     
     print("🔍 MAC Address Device Finder")
     print("=" * 40)
-    print(f"🎯 Looking for MAC: {target_mac}")
+    print(f"🎯 Looking for MAC: {_format_mac(target_mac)}")
     
     # Check current ARP table first
     print("\n📋 Checking current ARP table...")
@@ -209,9 +738,11 @@ def main():
     
     # Scan networks
     all_found_ips = []
-    for network in networks:
-        found_ips = scan_specific_network(network, target_mac)
-        all_found_ips.extend(found_ips)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=PING_WORKERS,
+                                               thread_name_prefix='ping') as executor:
+        for network in networks:
+            found_ips = scan_specific_network(network, target_mac, executor, args.use_nmap)
+            all_found_ips.extend(found_ips)
     
     # Final results
     print("\n" + "=" * 40)
@@ -6,13 +6,103 @@ with support for YAML files and default fallback values.
 """
 
 import os
+import copy
+import json
 import yaml
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Any, ClassVar, Mapping, Tuple
 from pathlib import Path
 
 from utils.logger import setup_logger
 
 
+# libyaml-backed loader when available, pure-Python otherwise
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+# Default configuration, built once at import. Read-only at the top level;
+# callers that need a mutable copy go through _get_default_config()
+_DEFAULTS: Mapping[str, Any] = MappingProxyType({
+    'robot': {
+        'name': 'RTK-VL Robot',
+        'version': '1.0.0',
+        'control_frequency': 100,  # Hz
+        'cpu_affinity': None,  # CPUs to pin the control loop to
+        'realtime_priority': None  # SCHED_FIFO priority for the control loop, None to disable
+    },
+    'dynamixel': {
+        'enabled': True,
+        'port': '/dev/ttyUSB0',
+        'baudrate': 1000000,
+        'protocol_version': 2.0,
+        'reply_on_write': False,
+        'return_delay_time': 0,
+        'target_baudrate': None,
+        'motors': {
+            'base_rotation': {'id': 1, 'model': 'XM430-W350'},
+            'shoulder': {'id': 2, 'model': 'XM430-W350'},
+            'elbow': {'id': 3, 'model': 'XM430-W350'},
+            'wrist': {'id': 4, 'model': 'XM430-W350'}
+        }
+    },
+    'lidar': {
+        'enabled': True,
+        'type': 'rplidar',
+        'port': '/dev/ttyUSB1',
+        'baudrate': 115200,
+        'scan_frequency': 10,  # Hz
+        'max_distance': 12.0   # meters
+    },
+    'camera': {
+        'enabled': True,
+        'devices': [
+            {
+                'id': 0,
+                'name': 'front_camera',
+                'resolution': [640, 480],
+                'fps': 30,
+                'pixel_format': 'MJPG'
+            }
+        ]
+    },
+    'npu': {
+        'enabled': False,
+        'type': 'coral',  # 'coral', 'jetson', or 'cpu'
+        'model_path': 'models/detection_model.tflite',
+        'num_threads': 0  # CPU inference threads, 0 = one per core
+    },
+    'vision': {
+        'object_detection': {
+            'enabled': True,
+            'confidence_threshold': 0.5,
+            'nms_threshold': 0.4
+        },
+        'face_recognition': {
+            'enabled': False,
+            'database_path': 'data/faces',
+            'detector_model': None  # YuNet ONNX model; Haar cascade without it
+        }
+    },
+    'navigation': {
+        'slam': {
+            'enabled': True,
+            'map_resolution': 0.05,  # meters per pixel
+            'map_size': [2000, 2000]  # pixels
+        },
+        'path_planning': {
+            'algorithm': 'a_star',
+            'safety_margin': 0.3  # meters
+        }
+    },
+    'logging': {
+        'level': 'INFO',
+        'file': 'data/logs/robot.log',
+        'max_size': '10MB',
+        'backup_count': 5
+    }
+})
+
+
 class ConfigManager:
     """
     Manages robot configuration settings with YAML persistence.
@@ -26,6 +116,10 @@ class ConfigManager:
         logger: Logger instance for configuration operations
     """
     
+    # Parsed configurations shared by all instances, keyed by resolved path
+    # and invalidated when the file's modification time or size changes
+    _cache: ClassVar[Dict[Path, Tuple[Tuple[int, int], Dict[str, Any]]]] = {}
+    
     def __init__(self, config_path: str = "config/robot_config.yaml"):
         """
         Initialize configuration manager.
@@ -43,12 +137,19 @@ class ConfigManager:
         self.config_path = Path(config_path)
         self.config: Dict[str, Any] = {}
         
+        # Machine-readable copy of the YAML file, much cheaper to parse
+        self.sidecar_path = self.config_path.with_suffix('.json')
+        
+        # Every dot-notation path in config mapped to its value, for O(1) get()
+        self._flat: Dict[str, Any] = {}
+        
     def load_config(self) -> Dict[str, Any]:
         """
         Load configuration from file with fallback to defaults.
         
         Attempts to load from the specified file, falling back to default
-        configuration if the file doesn't exist or is invalid.
+        configuration if the file doesn't exist or is invalid. Files that
+        have not changed since they were last parsed are served from cache.
         
         Returns:
             Complete configuration dictionary
@@ -58,20 +159,31 @@ class ConfigManager:
         """
         try:
             if self.config_path.exists():
-                with open(self.config_path, 'r') as f:
-                    self.config = yaml.safe_load(f) or {}
-                self.logger.info(f"Configuration loaded from {self.config_path}")
+                cache_key = self.config_path.resolve()
+                signature = self._file_signature()
+                
+                cached = self._cache.get(cache_key)
+                if cached and cached[0] == signature:
+                    self.config = copy.deepcopy(cached[1])
+                else:
+                    self.config = self._read_config_file(signature)
+                    self._cache[cache_key] = (signature, copy.deepcopy(self.config))
+                    self.logger.info(f"Configuration loaded from {self.config_path}")
             else:
                 self.logger.warning(f"Config file not found at {self.config_path}, using defaults")
                 self.config = self._get_default_config()
                 self.save_config()
-                
+            
+            self._flat = {}
+            self._index('', self.config)
             return self.config
             
         except Exception as e:
             self.logger.error(f"Failed to load configuration: {e}")
             self.logger.info("Falling back to default configuration")
             self.config = self._get_default_config()
+            self._flat = {}
+            self._index('', self.config)
             return self.config
     
     def save_config(self):
@@ -90,18 +202,68 @@ class ConfigManager:
             
             with open(self.config_path, 'w') as f:
                 yaml.dump(self.config, f, default_flow_style=False, indent=2)
+            signature = self._file_signature()
+            self._write_sidecar(self.config, signature)
             
+            self._cache[self.config_path.resolve()] = (signature, copy.deepcopy(self.config))
             self.logger.info(f"Configuration saved to {self.config_path}")
             
         except Exception as e:
             self.logger.error(f"Failed to save configuration: {e}")
     
+    def _file_signature(self) -> Tuple[int, int]:
+        """
+        Identify the current contents of the YAML file.
+        
+        Returns:
+            Modification time in nanoseconds and size of the YAML file
+        """
+        st = self.config_path.stat()
+        return st.st_mtime_ns, st.st_size
+    
+    def _read_config_file(self, signature: Tuple[int, int]) -> Dict[str, Any]:
+        """
+        Read the configuration from the JSON sidecar or the YAML file.
+        
+        The sidecar records the signature of the YAML file it was built
+        from and is only used on an exact match, so a YAML file replaced by
+        one with an older timestamp (cp -p, rsync -t, tar) is still parsed.
+        After a YAML parse the sidecar is regenerated for the next load.
+        
+        Args:
+            signature: Modification time in nanoseconds and size of the YAML file
+            
+        Returns:
+            Parsed configuration dictionary
+        """
+        try:
+            sidecar = json.loads(self.sidecar_path.read_text())
+            if sidecar.get('source') == list(signature):
+                return sidecar['config']
+        except (OSError, ValueError, AttributeError, KeyError):
+            pass
+        
+        with open(self.config_path, 'r') as f:
+            config = yaml.load(f, Loader=_YAML_LOADER) or {}
+        
+        self._write_sidecar(config, signature)
+        return config
+    
+    def _write_sidecar(self, config: Dict[str, Any], signature: Tuple[int, int]):
+        """Write a configuration and its YAML file signature to the JSON sidecar, best effort."""
+        try:
+            self.sidecar_path.write_text(json.dumps({'source': list(signature), 'config': config}))
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.debug(f"Could not write config sidecar {self.sidecar_path}: {e}")
+    
     def get(self, key: str, default=None):
         """
         Get configuration value using dot notation.
         
         Supports nested key access using dot notation (e.g., 'robot.name').
-        Returns the default value if the key path doesn't exist.
+        Returns the default value if the key path doesn't exist. Paths are
+        resolved from an index built at load time, so lookups are a single
+        dictionary probe regardless of depth.
         
         Args:
             key: Configuration key path with dot notation support
@@ -118,15 +280,7 @@ class ConfigManager:
             >>> config.get('nonexistent.key', 'fallback')
             'fallback'
         """
-        keys = key.split('.')
-        value = self.config
-        
-        try:
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            return default
+        return self._flat.get(key, default)
     
     def set(self, key: str, value: Any):
         """
@@ -154,6 +308,35 @@ class ConfigManager:
         
         # Set the value
         config[keys[-1]] = value
+        
+        # Drop index entries below the replaced value, then re-index the
+        # path down to and including the new value
+        prefix = key + '.'
+        for stale in [k for k in self._flat if k.startswith(prefix)]:
+            del self._flat[stale]
+        
+        config = self.config
+        for depth, k in enumerate(keys[:-1], start=1):
+            config = config[k]
+            self._flat['.'.join(keys[:depth])] = config
+        self._index(key, value)
+    
+    def _index(self, prefix: str, value: Any):
+        """
+        Record dot-notation paths for a value and everything nested in it.
+        
+        Args:
+            prefix: Dot-notation path of value, empty for the root
+            value: Configuration value to index
+        """
+        stack = [(prefix, value)]
+        while stack:
+            path, node = stack.pop()
+            if path:
+                self._flat[path] = node
+            if isinstance(node, dict):
+                for k, v in node.items():
+                    stack.append((f"{path}.{k}" if path else str(k), v))
     
     def _get_default_config(self) -> Dict[str, Any]:
         """
@@ -165,74 +348,4 @@ class ConfigManager:
         Returns:
             Default configuration dictionary with all required sections
         """
-        return {
-            'robot': {
-                'name': 'RTK-VL Robot',
-                'version': '1.0.0',
-                'control_frequency': 100  # Hz
-            },
-            'dynamixel': {
-                'enabled': True,
-                'port': '/dev/ttyUSB0',
-                'baudrate': 1000000,
-                'protocol_version': 2.0,
-                'motors': {
-                    'base_rotation': {'id': 1, 'model': 'XM430-W350'},
-                    'shoulder': {'id': 2, 'model': 'XM430-W350'},
-                    'elbow': {'id': 3, 'model': 'XM430-W350'},
-                    'wrist': {'id': 4, 'model': 'XM430-W350'}
-                }
-            },
-            'lidar': {
-                'enabled': True,
-                'type': 'rplidar',
-                'port': '/dev/ttyUSB1',
-                'baudrate': 115200,
-                'scan_frequency': 10,  # Hz
-                'max_distance': 12.0   # meters
-            },
-            'camera': {
-                'enabled': True,
-                'devices': [
-                    {
-                        'id': 0,
-                        'name': 'front_camera',
-                        'resolution': [640, 480],
-                        'fps': 30
-                    }
-                ]
-            },
-            'npu': {
-                'enabled': False,
-                'type': 'coral',  # 'coral', 'jetson', or 'cpu'
-                'model_path': 'models/detection_model.tflite'
-            },
-            'vision': {
-                'object_detection': {
-                    'enabled': True,
-                    'confidence_threshold': 0.5,
-                    'nms_threshold': 0.4
-                },
-                'face_recognition': {
-                    'enabled': False,
-                    'database_path': 'data/faces'
-                }
-            },
-            'navigation': {
-                'slam': {
-                    'enabled': True,
-                    'map_resolution': 0.05,  # meters per pixel
-                    'map_size': [2000, 2000]  # pixels
-                },
-                'path_planning': {
-                    'algorithm': 'a_star',
-                    'safety_margin': 0.3  # meters
-                }
-            },
-            'logging': {
-                'level': 'INFO',
-                'file': 'data/logs/robot.log',
-                'max_size': '10MB',
-                'backup_count': 5
-            }
-        } 
\ No newline at end of file
+        return copy.deepcopy(dict(_DEFAULTS))
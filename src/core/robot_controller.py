@@ -5,9 +5,11 @@ Main controller coordinating all robot subsystems including Dynamixel servos,
 LiDAR sensors, cameras, and neural processing units.
 """
 
+import os
 import time
 import threading
-from typing import Dict, Any, Optional
+import numpy as np
+from typing import Callable, Dict, Any, List, Optional
 from dataclasses import dataclass
 
 from hardware.dynamixel_controller import DynamixelController
@@ -16,18 +18,244 @@ from hardware.camera_controller import CameraController
 from hardware.npu_controller import NPUController
 from vision.vision_processor import VisionProcessor
 from navigation.navigation_system import NavigationSystem
-from utils.logger import setup_logger
+from utils.logger import setup_logger, DeferredLog
+
+
+# Control loop timing: sleep until this close to the deadline, then spin
+SPIN_WINDOW_NS = 200_000
+# Remaining time below which sleeping is not worth the wakeup latency
+MIN_SLEEP_NS = 500_000
+# Minimum interval between status publications from the sub-controllers
+STATUS_PUBLISH_INTERVAL_NS = 100_000_000
+
+
+def _sleep_until(deadline_ns: int):
+    """Sleep coarsely until just before a monotonic deadline, then spin to it."""
+    monotonic_ns = time.monotonic_ns
+    remaining_ns = deadline_ns - monotonic_ns()
+    if remaining_ns > MIN_SLEEP_NS:
+        time.sleep((remaining_ns - SPIN_WINDOW_NS) / 1e9)
+    while monotonic_ns() < deadline_ns:
+        pass
+
+
+class _SubsystemPoller:
+    """
+    Polls one subsystem on its own thread at a fixed rate.
+    
+    The control loop reads the latest result instead of calling the
+    subsystem itself, so a slow sensor no longer stretches every control
+    iteration. Results are published by a single reference assignment,
+    which readers observe atomically without taking a lock.
+    
+    Attributes:
+        name: Subsystem name used for the thread and log messages
+        latest: Return value of the most recent poll
+        last_update: Monotonic time in ns of the most recent poll
+    """
+    
+    def __init__(self, name: str, poll: Callable[[], Any], frequency: float, log: DeferredLog):
+        """
+        Initialize subsystem poller.
+        
+        Args:
+            name: Subsystem name
+            poll: Callable invoked once per period
+            frequency: Poll rate in Hz
+            log: Deferred log for errors raised while polling
+        """
+        self.log = log
+        self.name = name
+        self.poll = poll
+        self.interval_ns = int(1_000_000_000 / frequency)
+        
+        self.latest: Any = None
+        self.last_update = 0
+        self.is_running = False
+        self.thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start the polling thread."""
+        self.is_running = True
+        self.thread = threading.Thread(target=self._poll_loop, name=f"{self.name}-poller", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Stop the polling thread and wait for it to exit."""
+        self.is_running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+    
+    def _poll_loop(self):
+        """Poll the subsystem on absolute deadlines until stopped."""
+        next_tick = time.monotonic_ns()
+        while self.is_running:
+            try:
+                self.latest = self.poll()
+                self.last_update = time.monotonic_ns()
+            except Exception as e:
+                self.log.error("Error polling %s: %s", self.name, e)
+            
+            next_tick += self.interval_ns
+            now = time.monotonic_ns()
+            if now - next_tick > self.interval_ns:
+                next_tick = now + self.interval_ns
+            
+            # Plain sleep: spinning here would hold the GIL against the
+            # control thread, which is the only one that spins
+            remaining_ns = next_tick - time.monotonic_ns()
+            if remaining_ns > 0:
+                time.sleep(remaining_ns / 1e9)
 
 
-@dataclass
 class RobotState:
-    """Robot operational state container."""
-    position: tuple[float, float, float] = (0.0, 0.0, 0.0)
-    velocity: tuple[float, float, float] = (0.0, 0.0, 0.0)
-    battery_level: float = 100.0
-    temperature: float = 25.0
-    is_moving: bool = False
-    last_update: float = 0.0
+    """
+    Robot operational state container.
+    
+    The numeric fields share one contiguous float64 buffer laid out as
+    [x, y, theta, vx, vy, vtheta, battery_level, temperature, is_moving],
+    so a snapshot is a single copy and no field is boxed per access.
+    position and velocity are (x, y, theta) views into the buffer.
+    
+    Attributes:
+        last_update: time.monotonic_ns() of the last control iteration, kept
+                     as an int since float64 cannot hold it exactly
+    """
+    
+    __slots__ = ('_buf', 'last_update')
+    
+    _POSITION = slice(0, 3)
+    _VELOCITY = slice(3, 6)
+    _BATTERY = 6
+    _TEMPERATURE = 7
+    _MOVING = 8
+    _SIZE = 9
+    
+    def __init__(self, buf: Optional[np.ndarray] = None, last_update: int = 0):
+        """
+        Initialize robot state.
+        
+        Args:
+            buf: Existing state buffer to take ownership of, defaults to a
+                 stationary robot with a full battery at 25 °C
+            last_update: Time of the last control iteration in ns
+        """
+        if buf is None:
+            buf = np.zeros(self._SIZE, dtype=np.float64)
+            buf[self._BATTERY] = 100.0
+            buf[self._TEMPERATURE] = 25.0
+        self._buf = buf
+        self.last_update = last_update
+    
+    @property
+    def position(self) -> np.ndarray:
+        return self._buf[self._POSITION]
+    
+    @position.setter
+    def position(self, value):
+        self._buf[self._POSITION] = value
+    
+    @property
+    def velocity(self) -> np.ndarray:
+        return self._buf[self._VELOCITY]
+    
+    @velocity.setter
+    def velocity(self, value):
+        self._buf[self._VELOCITY] = value
+    
+    @property
+    def battery_level(self) -> float:
+        return float(self._buf[self._BATTERY])
+    
+    @battery_level.setter
+    def battery_level(self, value: float):
+        self._buf[self._BATTERY] = value
+    
+    @property
+    def temperature(self) -> float:
+        return float(self._buf[self._TEMPERATURE])
+    
+    @temperature.setter
+    def temperature(self, value: float):
+        self._buf[self._TEMPERATURE] = value
+    
+    @property
+    def is_moving(self) -> bool:
+        return bool(self._buf[self._MOVING])
+    
+    @is_moving.setter
+    def is_moving(self, value: bool):
+        self._buf[self._MOVING] = value
+    
+    def copy(self) -> 'RobotState':
+        """Return an independent snapshot of this state."""
+        return RobotState(self._buf.copy(), self.last_update)
+    
+    def __repr__(self) -> str:
+        return (f"RobotState(position={tuple(self.position)}, velocity={tuple(self.velocity)}, "
+                f"battery_level={self.battery_level}, temperature={self.temperature}, "
+                f"is_moving={self.is_moving}, last_update={self.last_update})")
+
+
+@dataclass(frozen=True)
+class RobotConfig:
+    """Controller settings resolved once from the configuration dictionary."""
+    # Declared by hand because dataclass(slots=True) needs Python 3.10
+    __slots__ = (
+        'dynamixel_enabled', 'lidar_enabled', 'camera_enabled', 'npu_enabled',
+        'dynamixel', 'lidar', 'camera', 'npu', 'vision', 'navigation',
+        'control_frequency', 'camera_fps', 'cpu_affinity', 'realtime_priority',
+    )
+    
+    dynamixel_enabled: bool
+    lidar_enabled: bool
+    camera_enabled: bool
+    npu_enabled: bool
+    dynamixel: Dict[str, Any]
+    lidar: Dict[str, Any]
+    camera: Dict[str, Any]
+    npu: Dict[str, Any]
+    vision: Dict[str, Any]
+    navigation: Dict[str, Any]
+    control_frequency: float
+    camera_fps: float
+    cpu_affinity: Optional[List[int]]
+    realtime_priority: Optional[int]
+    
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> 'RobotConfig':
+        """
+        Build controller settings from a configuration dictionary.
+        
+        Args:
+            config: Complete robot configuration dictionary
+            
+        Returns:
+            Resolved controller settings
+        """
+        dynamixel = config.get('dynamixel') or {}
+        lidar = config.get('lidar') or {}
+        camera = config.get('camera') or {}
+        npu = config.get('npu') or {}
+        camera_devices = camera.get('devices') or [{}]
+        robot = config.get('robot') or {}
+        
+        return cls(
+            dynamixel_enabled=dynamixel.get('enabled', False),
+            lidar_enabled=lidar.get('enabled', False),
+            camera_enabled=camera.get('enabled', False),
+            npu_enabled=npu.get('enabled', False),
+            dynamixel=dynamixel,
+            lidar=lidar,
+            camera=camera,
+            npu=npu,
+            vision=config.get('vision') or {},
+            navigation=config.get('navigation') or {},
+            control_frequency=robot.get('control_frequency', 100),
+            camera_fps=camera_devices[0].get('fps', 30),
+            cpu_affinity=robot.get('cpu_affinity'),
+            realtime_priority=robot.get('realtime_priority')
+        )
 
 
 class RobotController:
@@ -39,6 +267,7 @@ class RobotController:
     
     Attributes:
         config: Robot configuration dictionary
+        cfg: Controller settings resolved from config
         is_initialized: Whether the controller is initialized
         is_running: Whether the main control loop is running
         state: Current robot operational state
@@ -54,11 +283,44 @@ class RobotController:
         """
         self.logger = setup_logger(__name__)
         self.config = config
+        self.cfg = RobotConfig.from_dict(config)
         self.is_initialized = False
         self.is_running = False
         
+        # Used from the control loop and pollers, where formatting and
+        # handler locks would add unbounded latency
+        self.rt_log = DeferredLog(self.logger)
+        
         self.state = RobotState()
-        self.state_lock = threading.Lock()
+        
+        # Seqlock over state: odd while the control loop is writing it, so
+        # readers retry instead of waiting on a lock held by the writer
+        self._state_seq = 0
+        
+        # Set by an emergency stop and cleared only by resume(), so the
+        # control loop sends no motion command in between
+        self._estop = threading.Event()
+        
+        # get_system_status() result, refilled in place on every call
+        self._status: Dict[str, Any] = {
+            'initialized': None,
+            'running': None,
+            'timestamp': None,
+            'hardware': {}
+        }
+        
+        # Status page the sub-controllers publish into from the sensor
+        # update, one slot per controller; _status_published is the
+        # monotonic_ns() of the last publication
+        self._status_page: Dict[str, Dict[str, Any]] = {}
+        self._status_published: Optional[int] = None
+        
+        # Background pollers for sensors, vision and navigation while running
+        self._pollers: List[_SubsystemPoller] = []
+        
+        # Body of update(), rebuilt whenever the set of subsystems or the
+        # polling mode changes
+        self._control_cycle: Callable[[], None] = lambda: None
         
         self.dynamixel_controller: Optional[DynamixelController] = None
         self.lidar_controller: Optional[LidarController] = None
@@ -77,21 +339,22 @@ class RobotController:
         try:
             self.logger.info("Initializing robot hardware subsystems...")
             
-            if self.config.get('dynamixel', {}).get('enabled', False):
+            if self.cfg.dynamixel_enabled:
                 self._initialize_dynamixel()
             
-            if self.config.get('lidar', {}).get('enabled', False):
+            if self.cfg.lidar_enabled:
                 self._initialize_lidar()
             
-            if self.config.get('camera', {}).get('enabled', False):
+            if self.cfg.camera_enabled:
                 self._initialize_camera()
             
-            if self.config.get('npu', {}).get('enabled', False):
+            if self.cfg.npu_enabled:
                 self._initialize_npu()
             
             self._initialize_vision_processor()
             self._initialize_navigation_system()
             
+            self._control_cycle = self._build_control_cycle()
             self.is_initialized = True
             self.logger.info("All hardware subsystems initialized successfully")
             
@@ -102,32 +365,32 @@ class RobotController:
     def _initialize_dynamixel(self):
         """Initialize Dynamixel servo controller."""
         self.logger.info("Initializing Dynamixel controller...")
-        self.dynamixel_controller = DynamixelController(self.config['dynamixel'])
+        self.dynamixel_controller = DynamixelController(self.cfg.dynamixel)
         self.dynamixel_controller.initialize()
     
     def _initialize_lidar(self):
         """Initialize LiDAR sensor controller."""
         self.logger.info("Initializing LiDAR controller...")
-        self.lidar_controller = LidarController(self.config['lidar'])
+        self.lidar_controller = LidarController(self.cfg.lidar)
         self.lidar_controller.initialize()
     
     def _initialize_camera(self):
         """Initialize camera system controller."""
         self.logger.info("Initializing camera controller...")
-        self.camera_controller = CameraController(self.config['camera'])
+        self.camera_controller = CameraController(self.cfg.camera)
         self.camera_controller.initialize()
     
     def _initialize_npu(self):
         """Initialize neural processing unit controller."""
         self.logger.info("Initializing NPU controller...")
-        self.npu_controller = NPUController(self.config['npu'])
+        self.npu_controller = NPUController(self.cfg.npu)
         self.npu_controller.initialize()
     
     def _initialize_vision_processor(self):
         """Initialize computer vision processing system."""
         self.logger.info("Initializing vision processor...")
         self.vision_processor = VisionProcessor(
-            self.config['vision'],
+            self.cfg.vision,
             self.camera_controller,
             self.npu_controller
         )
@@ -136,7 +399,7 @@ class RobotController:
         """Initialize autonomous navigation system."""
         self.logger.info("Initializing navigation system...")
         self.navigation_system = NavigationSystem(
-            self.config['navigation'],
+            self.cfg.navigation,
             self.lidar_controller
         )
     
@@ -153,37 +416,199 @@ class RobotController:
         self.is_running = True
         self.logger.info("Starting robot control loop...")
         
-        control_frequency = self.config.get('robot', {}).get('control_frequency', 100)
-        update_interval = 1.0 / control_frequency
+        control_frequency = self.cfg.control_frequency
+        interval_ns = int(1_000_000_000 / control_frequency)
         
-        while self.is_running:
-            start_time = time.time()
+        self._start_pollers(control_frequency)
+        self.enable_realtime_scheduling()
+        
+        # Bind everything the loop touches to locals, so each iteration does
+        # fast local loads instead of global and attribute lookups
+        update = self.update
+        monotonic_ns = time.monotonic_ns
+        sleep_until = _sleep_until
+        log_debug = self.rt_log.debug
+        
+        # Deadlines are absolute so iterations keep a fixed phase instead of
+        # accumulating the drift of each update's run time
+        next_tick = monotonic_ns()
+        try:
+            while self.is_running:
+                update()
+                
+                next_tick += interval_ns
+                now = monotonic_ns()
+                if now - next_tick > interval_ns:
+                    # Overran by more than a period: drop frames and resync
+                    log_debug("Control loop overran by %.1f ms, dropping frames", (now - next_tick) / 1e6)
+                    next_tick = now + interval_ns
+                
+                sleep_until(next_tick)
+        finally:
+            self._stop_pollers()
+    
+    def _start_pollers(self, control_frequency: float):
+        """
+        Move sensor, vision and navigation updates onto their own threads.
+        
+        Serial, V4L2 and inference calls release the GIL while they wait on
+        hardware, so the subsystems overlap instead of running back to back
+        inside every control iteration. The sensor poller's bulk reads and
+        the control thread's goal writes share the Dynamixel port, which
+        the controller serializes with its port lock.
+        
+        Args:
+            control_frequency: Control loop rate in Hz, used for sensors and navigation
+        """
+        vision_frequency = self.cfg.camera_fps
+        
+        if self.dynamixel_controller or self.lidar_controller:
+            self._pollers.append(_SubsystemPoller('sensors', self._update_sensor_data, control_frequency, self.rt_log))
+        if self.vision_processor:
+            self._pollers.append(_SubsystemPoller('vision', self._update_vision_processing, vision_frequency, self.rt_log))
+        if self.navigation_system:
+            self._pollers.append(_SubsystemPoller('navigation', self._update_navigation, control_frequency, self.rt_log))
+        
+        for poller in self._pollers:
+            poller.start()
+        self._control_cycle = self._build_control_cycle()
+    
+    def _stop_pollers(self):
+        """Stop all background subsystem pollers."""
+        for poller in self._pollers:
+            poller.stop()
+        self._pollers = []
+        self._control_cycle = self._build_control_cycle()
+    
+    def _build_control_cycle(self) -> Callable[[], None]:
+        """
+        Build the body of one control iteration as a single closure.
+        
+        Subsystem presence and the polling mode are resolved here once, and
+        the bound methods the iteration needs are captured as closure cells,
+        so update() does not re-check each subsystem or walk self.* chains.
+        
+        Returns:
+            Callable running one control iteration
+        """
+        estop_set = self._estop.is_set
+        execute = self.dynamixel_controller.execute_command if self.dynamixel_controller else None
+        next_tick = self.dynamixel_controller.next_tick if self.dynamixel_controller else lambda: None
+        
+        if self._pollers:
+            navigation = next((p for p in self._pollers if p.name == 'navigation'), None)
+            if navigation is None or execute is None:
+                return next_tick
             
-            self.update()
+            def polled_cycle():
+                next_tick()
+                # Take the navigation poller's latest command so each one
+                # is executed once
+                command, navigation.latest = navigation.latest, None
+                if command and not estop_set():
+                    execute(command)
             
-            elapsed = time.time() - start_time
-            sleep_time = max(0, update_interval - elapsed)
-            time.sleep(sleep_time)
+            return polled_cycle
+        
+        steps = []
+        if self.dynamixel_controller:
+            steps.append(self.dynamixel_controller.update_all_sensors)
+        if self.lidar_controller:
+            steps.append(self.lidar_controller.update)
+        steps.append(self._publish_status)
+        if self.vision_processor:
+            steps.append(self.vision_processor.process_frame)
+        steps = tuple(steps)
+        navigate = self.navigation_system.update if self.navigation_system else None
+        
+        def sync_cycle():
+            next_tick()
+            for step in steps:
+                step()
+            if navigate is None:
+                return
+            command = navigate()
+            if command and execute is not None and not estop_set():
+                execute(command)
+        
+        return sync_cycle
+    
+    def enable_realtime_scheduling(self):
+        """
+        Apply the configured CPU pinning and real-time policy to the calling thread.
+        
+        Pins the thread to the configured CPUs, if any, so it is not
+        migrated between cores mid-period. SCHED_FIFO is opt-in through
+        robot.realtime_priority, since the control thread also runs bus
+        reads, vision and planning and could starve other threads on its
+        core; without it the scheduling policy is left unchanged. Worker threads started later
+        from this thread reset both with reset_thread_scheduling.
+        """
+        if self.cfg.cpu_affinity and hasattr(os, 'sched_setaffinity'):
+            try:
+                os.sched_setaffinity(0, self.cfg.cpu_affinity)
+                self.logger.info(f"Control loop pinned to CPUs {self.cfg.cpu_affinity}")
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Failed to set CPU affinity: {e}")
+        
+        priority = self.cfg.realtime_priority
+        if priority is None or not hasattr(os, 'sched_setscheduler'):
+            return
+        
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+            self.logger.info(f"Control loop running with SCHED_FIFO priority {priority}")
+        except (OSError, ValueError) as e:
+            self.logger.debug(f"Real-time scheduling not available: {e}")
     
     def update(self):
         """
         Execute single control loop iteration.
         
         Updates all subsystems, processes sensor data, and executes
-        navigation and control commands.
+        navigation and control commands. While the control loop is running
+        the subsystems are polled in the background and only the control
+        commands are executed here.
         """
         if not self.is_initialized:
             return
         
-        current_time = time.time()
+        now_ns = time.monotonic_ns()
+        self._control_cycle()
+        self._write_state(last_update=now_ns)
+    
+    def _write_state(self, **fields):
+        """
+        Update RobotState fields under the seqlock.
         
-        with self.state_lock:
-            self._update_sensor_data()
-            self._update_navigation()
-            self._update_vision_processing()
-            self._execute_control_commands()
-            
-            self.state.last_update = current_time
+        Only the control loop writes state, so the counter needs no lock of
+        its own.
+        
+        Args:
+            **fields: RobotState fields to update
+        """
+        self._state_seq += 1
+        for name, value in fields.items():
+            setattr(self.state, name, value)
+        self._state_seq += 1
+    
+    def get_state(self) -> RobotState:
+        """
+        Get a consistent snapshot of the robot state without blocking.
+        
+        Returns:
+            Copy of the current RobotState
+        """
+        while True:
+            seq = self._state_seq
+            if seq & 1:
+                # A write is in progress; yield so the writer can finish
+                # instead of spinning through the GIL switch interval
+                time.sleep(0)
+                continue
+            snapshot = self.state.copy()
+            if self._state_seq == seq:
+                return snapshot
     
     def _update_sensor_data(self):
         """Update sensor readings from all hardware subsystems."""
@@ -192,68 +617,121 @@ class RobotController:
         
         if self.lidar_controller:
             self.lidar_controller.update()
+        
+        self._publish_status()
     
-    def _update_navigation(self):
-        """Update navigation system and path planning."""
+    def _publish_status(self, refresh: bool = False):
+        """
+        Have the sub-controllers publish their status into the status page.
+        
+        Runs after the sensor update, at most once per
+        STATUS_PUBLISH_INTERVAL_NS, so the published values are those the
+        update just read and no extra hardware traffic is generated.
+        
+        Args:
+            refresh: Read the motor sensors first, for when no sensor
+                     update is running
+        """
+        now = time.monotonic_ns()
+        if self._status_published is not None and now - self._status_published < STATUS_PUBLISH_INTERVAL_NS:
+            return
+        
+        if refresh and self.dynamixel_controller:
+            self.dynamixel_controller.update_all_sensors()
+        
+        page = self._status_page
+        for name, controller in (
+            ('dynamixel', self.dynamixel_controller),
+            ('lidar', self.lidar_controller),
+            ('camera', self.camera_controller),
+            ('npu', self.npu_controller)
+        ):
+            if controller:
+                controller.publish_status(page, name)
+            else:
+                page.pop(name, None)
+        
+        self._status_published = now
+    
+    def _update_navigation(self) -> Optional[Dict[str, Any]]:
+        """Update navigation system and path planning.
+        
+        Returns:
+            Movement command from the navigation system, or None
+        """
         if self.navigation_system:
-            self.navigation_system.update()
+            return self.navigation_system.update()
+        return None
     
     def _update_vision_processing(self):
         """Update computer vision processing and object detection."""
         if self.vision_processor:
             self.vision_processor.process_frame()
     
-    def _execute_control_commands(self):
-        """Execute motor control commands based on navigation decisions."""
-        if self.navigation_system and self.dynamixel_controller:
-            command = self.navigation_system.get_movement_command()
-            if command:
-                self.dynamixel_controller.execute_command(command)
-    
     def get_system_status(self) -> Dict[str, Any]:
         """
         Get comprehensive system status information.
         
+        Hardware status is read from the page the sub-controllers publish
+        into during the sensor update, so this makes no hardware calls and
+        never waits on the control loop. Nothing publishes while the
+        control loop is stopped, so the page is refreshed from here then.
+        The same dictionary is refilled in place on every call; callers
+        that keep a snapshot across calls must copy it.
+        
         Returns:
             Dictionary containing current status of all subsystems including
             initialization state, hardware health, and operational metrics
         """
-        status = {
-            'initialized': self.is_initialized,
-            'running': self.is_running,
-            'timestamp': time.time(),
-            'hardware': {}
-        }
-        
-        if self.dynamixel_controller:
-            status['hardware']['dynamixel'] = self.dynamixel_controller.get_status()
+        if not self.is_running:
+            self._publish_status(refresh=True)
         
-        if self.lidar_controller:
-            status['hardware']['lidar'] = self.lidar_controller.get_status()
-        
-        if self.camera_controller:
-            status['hardware']['camera'] = self.camera_controller.get_status()
-        
-        if self.npu_controller:
-            status['hardware']['npu'] = self.npu_controller.get_status()
+        status = self._status
+        status['initialized'] = self.is_initialized
+        status['running'] = self.is_running
+        status['timestamp'] = time.time()
         
+        hardware = status['hardware']
+        hardware.clear()
+        hardware.update(self._status_page)
         return status
     
     def emergency_stop(self):
         """
         Execute immediate emergency stop of all robot motion.
         
-        Stops all motors and navigation immediately for safety.
-        This is a blocking operation that takes priority over all other commands.
+        Stops all motors and navigation immediately for safety. Motion
+        commands stay suppressed until resume() is called, so this does not
+        wait for the current control iteration to finish, and a command
+        computed before the stop is never executed after it.
         """
-        self.logger.warning("Emergency stop activated!")
+        self.rt_log.warning("Emergency stop activated!")
         
-        with self.state_lock:
-            if self.dynamixel_controller:
-                self.dynamixel_controller.stop_all_motors()
-            
-            if self.navigation_system:
-                self.navigation_system.emergency_stop()
+        self._estop.set()
+        
+        # Drop a command the navigation poller published before the stop
+        for poller in self._pollers:
+            if poller.name == 'navigation':
+                poller.latest = None
+        
+        if self.navigation_system:
+            self.navigation_system.emergency_stop()
+        
+        if self.dynamixel_controller and not self.dynamixel_controller.emergency_stop():
+            self.rt_log.error("Emergency stop was not confirmed by the motor controller")
+    
+    def resume(self):
+        """Allow motion commands again after an emergency stop."""
+        if self.navigation_system:
+            self.navigation_system.resume()
+        
+        # Stale commands from before the stop are not executed
+        for poller in self._pollers:
+            if poller.name == 'navigation':
+                poller.latest = None
+        
+        self._estop.clear()
+        self.logger.info("Robot motion resumed")
     
     def navigate_to(self, target_position: tuple[float, float, float]) -> bool:
         """
@@ -280,6 +758,7 @@ class RobotController:
         """
         self.logger.info("Initiating robot controller shutdown...")
         self.is_running = False
+        self._stop_pollers()
         
         if self.dynamixel_controller:
             self.dynamixel_controller.shutdown()
@@ -294,4 +773,5 @@ class RobotController:
             self.npu_controller.shutdown()
         
         self.is_initialized = False
+        self.rt_log.close()
         self.logger.info("Robot controller shutdown complete") 
\ No newline at end of file
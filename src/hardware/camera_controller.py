@@ -3,12 +3,22 @@ Camera Controller - Interface for camera systems.
 """
 
 import cv2
+import sys
 import time
-import threading
 import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, List, Any, Optional
 
-from utils.logger import setup_logger
+from utils.logger import setup_logger, DeferredLog
+from utils.scheduling import reset_thread_scheduling
+
+
+# Driver-side frame buffers in the V4L2 MMAP ring
+DEFAULT_BUFFER_COUNT = 4
+
+# How early before a camera's next frame update() starts grabbing it
+FRAME_DUE_MARGIN_NS = 2_000_000
 
 
 class CameraController:
@@ -23,9 +33,31 @@ class CameraController:
         self.logger = setup_logger(__name__)
         self.config = config
         
+        # Capture paths log through this to stay off the logging locks
+        self.rt_log = DeferredLog(self.logger)
+        
+        # Static per-camera settings, keyed by name
         self.cameras: Dict[str, Dict] = {}
         self.is_initialized = False
-        self.frame_lock = threading.Lock()
+        
+        # Capture state as parallel per-camera lists indexed by position in
+        # _names; names are resolved to an index once per public call.
+        # Frames are captured into two preallocated slots per camera in
+        # turn, and _active holds the last completed slot (-1 before any)
+        self._names: List[str] = []
+        self._name_to_idx: Dict[str, int] = {}
+        self._caps: List[cv2.VideoCapture] = []
+        self._slots: List[List[np.ndarray]] = []
+        self._active: List[int] = []
+        self._timestamps = np.zeros(0, dtype=np.int64)
+        self._frame_periods = np.zeros(0, dtype=np.int64)
+        
+        # One worker per camera so grab()/retrieve() run concurrently;
+        # OpenCV releases the GIL while it waits on the device
+        self._pool: Optional[ThreadPoolExecutor] = None
+        
+        # Encodes and writes saved frames off the caller's thread, in order
+        self._writer: Optional[ThreadPoolExecutor] = None
         
     def initialize(self):
         """Initialize camera devices."""
@@ -35,7 +67,7 @@ class CameraController:
                 camera_name = camera_config['name']
                 
                 # Initialize camera
-                cap = cv2.VideoCapture(camera_id)
+                cap = self._open_capture(camera_id)
                 
                 if not cap.isOpened():
                     raise Exception(f"Failed to open camera {camera_name} (ID: {camera_id})")
@@ -43,23 +75,53 @@ class CameraController:
                 # Set camera properties
                 resolution = camera_config.get('resolution', [640, 480])
                 fps = camera_config.get('fps', 30)
+                pixel_format = camera_config.get('pixel_format')
+                
+                # The format has to be chosen before the frame size, since
+                # the sizes a sensor offers depend on it. Compressed MJPG
+                # avoids the software YUYV conversion and frees USB bandwidth
+                if pixel_format:
+                    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*pixel_format))
                 
                 cap.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
                 cap.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
                 cap.set(cv2.CAP_PROP_FPS, fps)
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, camera_config.get('buffer_count', DEFAULT_BUFFER_COUNT))
                 
                 # Store camera info
                 self.cameras[camera_name] = {
                     'id': camera_id,
-                    'capture': cap,
                     'resolution': resolution,
-                    'fps': fps,
-                    'latest_frame': None,
-                    'frame_timestamp': 0
+                    'fps': fps
                 }
                 
+                self._name_to_idx[camera_name] = len(self._names)
+                self._names.append(camera_name)
+                self._caps.append(cap)
+                self._slots.append([
+                    np.empty((resolution[1], resolution[0], 3), dtype=np.uint8)
+                    for _ in range(2)
+                ])
+                self._active.append(-1)
+                
                 self.logger.info(f"Camera {camera_name} (ID: {camera_id}) initialized")
             
+            self._timestamps = np.zeros(len(self._names), dtype=np.int64)
+            self._frame_periods = np.array(
+                [int(1_000_000_000 / self.cameras[name]['fps']) for name in self._names],
+                dtype=np.int64
+            )
+            self._pool = ThreadPoolExecutor(
+                max_workers=max(1, len(self.cameras)),
+                thread_name_prefix='camera',
+                initializer=reset_thread_scheduling
+            )
+            self._writer = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix='camera-writer',
+                initializer=reset_thread_scheduling
+            )
+            
             self.is_initialized = True
             self.logger.info("Camera controller initialized successfully")
             
@@ -67,6 +129,27 @@ class CameraController:
             self.logger.error(f"Failed to initialize camera controller: {e}")
             raise
     
+    def _open_capture(self, camera_id: int) -> cv2.VideoCapture:
+        """Open a camera, preferring OpenCV's V4L2 backend on Linux.
+        
+        The V4L2 backend streams through a ring of mmap'd driver buffers and
+        dequeues frames from it directly, whereas the default backend may
+        resolve to GStreamer or FFmpeg pipelines with their own copies.
+        
+        Args:
+            camera_id: Camera device index
+            
+        Returns:
+            VideoCapture for the device, possibly not opened
+        """
+        if sys.platform.startswith('linux'):
+            cap = cv2.VideoCapture(camera_id, cv2.CAP_V4L2)
+            if cap.isOpened():
+                return cap
+            cap.release()
+        
+        return cv2.VideoCapture(camera_id)
+    
     def capture_frame(self, camera_name: str) -> Optional[np.ndarray]:
         """Capture a frame from specified camera.
         
@@ -76,74 +159,146 @@ class CameraController:
         Returns:
             Captured frame as numpy array or None if error
         """
-        if not self.is_initialized or camera_name not in self.cameras:
+        idx = self._name_to_idx.get(camera_name)
+        if not self.is_initialized or idx is None:
             return None
         
-        camera = self.cameras[camera_name]
-        cap = camera['capture']
-        
-        ret, frame = cap.read()
+        slot = self._write_slot(idx)
+        ret, frame = self._caps[idx].read(self._slots[idx][slot])
         if not ret:
-            self.logger.warning(f"Failed to capture frame from camera {camera_name}")
+            self.rt_log.warning("Failed to capture frame from camera %s", camera_name)
             return None
         
-        # Update stored frame
-        with self.frame_lock:
-            camera['latest_frame'] = frame.copy()
-            camera['frame_timestamp'] = time.time()
-        
+        self._publish_frame(idx, slot, frame, time.monotonic_ns())
         return frame
     
+    def _write_slot(self, idx: int) -> int:
+        """Index of the slot not currently exposed to readers."""
+        active = self._active[idx]
+        return 1 - active if active >= 0 else 0
+    
+    def _publish_frame(self, idx: int, slot: int, frame: np.ndarray, timestamp_ns: int):
+        """Make a frame captured into a slot the camera's latest.
+        
+        OpenCV reallocates when the device delivers a different size than
+        configured, so the returned array replaces the slot. Switching the
+        active index is a single assignment, so readers need no lock.
+        """
+        self._slots[idx][slot] = frame
+        self._timestamps[idx] = timestamp_ns
+        self._active[idx] = slot
+    
     def get_latest_frame(self, camera_name: str) -> Optional[np.ndarray]:
         """Get the latest captured frame.
         
+        The frame is a read-only view of the capture buffer, not a copy. It
+        stays intact through the next capture and is overwritten by the one
+        after, so callers that keep it longer must copy it.
+        
         Args:
             camera_name: Name of the camera
             
         Returns:
             Latest frame or None if not available
         """
-        if camera_name not in self.cameras:
+        idx = self._name_to_idx.get(camera_name)
+        if idx is None:
+            return None
+        
+        active = self._active[idx]
+        if active < 0:
             return None
         
-        with self.frame_lock:
-            return self.cameras[camera_name]['latest_frame']
+        frame = self._slots[idx][active].view()
+        frame.flags.writeable = False
+        return frame
     
     def capture_all_frames(self) -> Dict[str, np.ndarray]:
         """Capture frames from all cameras.
         
+        Every camera is grabbed before any frame is decoded, so the cameras
+        wait for their next exposure concurrently rather than one after the
+        other, and the captured frames are as close in time as possible.
+        
         Returns:
             Dictionary mapping camera names to frames
         """
-        frames = {}
+        if not self.is_initialized or not self._caps:
+            return {}
         
-        for camera_name in self.cameras.keys():
-            frame = self.capture_frame(camera_name)
-            if frame is not None:
-                frames[camera_name] = frame
+        return self._capture(range(len(self._caps)))
+    
+    def _capture(self, indices) -> Dict[str, np.ndarray]:
+        """Grab then retrieve frames from the cameras at the given indices.
+        
+        Args:
+            indices: Camera indices to capture from
+            
+        Returns:
+            Dictionary mapping camera names to frames
+        """
+        write_slots = {i: self._write_slot(i) for i in indices}
+        
+        grabbed = dict(zip(indices, self._pool.map(lambda i: self._caps[i].grab(), indices)))
+        retrieved = list(self._pool.map(
+            lambda i: self._caps[i].retrieve(self._slots[i][write_slots[i]]) if grabbed[i] else (False, None),
+            indices
+        ))
+        
+        # Frames grabbed together share one capture time
+        captured_ns = time.monotonic_ns()
+        frames = {}
+        for i, (ret, frame) in zip(indices, retrieved):
+            if not ret:
+                self.rt_log.warning("Failed to capture frame from camera %s", self._names[i])
+                continue
+            self._publish_frame(i, write_slots[i], frame, captured_ns)
+            frames[self._names[i]] = frame
         
         return frames
     
-    def save_frame(self, camera_name: str, filename: str) -> bool:
+    def save_frame(self, camera_name: str, filename: str, wait: bool = False) -> bool:
         """Save current frame to file.
         
+        The frame is copied on the caller's thread and then encoded and
+        written by a background writer, so saving from the control loop does
+        not block on image encoding or disk I/O.
+        
         Args:
             camera_name: Name of the camera
             filename: Output filename
+            wait: Block until the file has been written
             
         Returns:
-            True if successful, False otherwise
+            True if the frame was queued (or written, when waiting), False otherwise
         """
         frame = self.get_latest_frame(camera_name)
         
-        if frame is None:
+        if frame is None or self._writer is None:
             return False
         
+        future: Future = self._writer.submit(self._write_frame, filename, frame.copy())
+        return future.result() if wait else True
+    
+    def _write_frame(self, filename: str, frame: np.ndarray) -> bool:
+        """Encode a frame and write it to disk, on the writer thread.
+        
+        Args:
+            filename: Output filename, whose extension selects the format
+            frame: Frame owned by the writer
+            
+        Returns:
+            True if successful, False otherwise
+        """
         try:
-            cv2.imwrite(filename, frame)
+            ok, encoded = cv2.imencode(Path(filename).suffix or '.jpg', frame)
+            if not ok:
+                raise ValueError(f"could not encode {filename}")
+            with open(filename, 'wb') as f:
+                f.write(encoded.tobytes())
             return True
         except Exception as e:
-            self.logger.error(f"Failed to save frame: {e}")
+            self.rt_log.error("Failed to save frame: %s", e)
             return False
     
     def get_camera_properties(self, camera_name: str) -> Optional[Dict[str, Any]]:
@@ -155,11 +310,11 @@ class CameraController:
         Returns:
             Dictionary of camera properties or None
         """
-        if camera_name not in self.cameras:
+        idx = self._name_to_idx.get(camera_name)
+        if idx is None:
             return None
         
-        camera = self.cameras[camera_name]
-        cap = camera['capture']
+        cap = self._caps[idx]
         
         return {
             'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
@@ -182,10 +337,11 @@ class CameraController:
         Returns:
             True if successful, False otherwise
         """
-        if camera_name not in self.cameras:
+        idx = self._name_to_idx.get(camera_name)
+        if idx is None:
             return False
         
-        cap = self.cameras[camera_name]['capture']
+        cap = self._caps[idx]
         
         property_map = {
             'brightness': cv2.CAP_PROP_BRIGHTNESS,
@@ -201,42 +357,83 @@ class CameraController:
         return cap.set(property_map[property_name], value)
     
     def update(self):
-        """Update camera frames - called from main loop."""
-        self.capture_all_frames()
+        """Update camera frames - called from main loop.
+        
+        Only cameras whose next frame is due according to their frame rate
+        are captured, so a 100 Hz loop does not block in grab() waiting on
+        30 fps cameras that have nothing new yet.
+        """
+        if not self.is_initialized or not self._caps:
+            return
+        
+        now_ns = time.monotonic_ns()
+        due = np.flatnonzero(now_ns - self._timestamps >= self._frame_periods - FRAME_DUE_MARGIN_NS)
+        if due.size:
+            self._capture(due.tolist())
     
-    def get_status(self) -> Dict[str, Any]:
+    def get_status(self, out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get camera system status.
         
+        Args:
+            out: Dictionary to fill in place instead of allocating a new one
+            
         Returns:
             Status dictionary
         """
-        status = {
-            'initialized': self.is_initialized,
-            'cameras': {}
-        }
+        status = {} if out is None else out
+        status['initialized'] = self.is_initialized
+        cameras = status.setdefault('cameras', {})
         
-        for camera_name, camera in self.cameras.items():
-            with self.frame_lock:
-                frame_age = time.time() - camera['frame_timestamp'] if camera['frame_timestamp'] > 0 else None
+        now_ns = time.monotonic_ns()
+        for idx, camera_name in enumerate(self._names):
+            camera = self.cameras[camera_name]
+            timestamp = self._timestamps[idx]
             
-            status['cameras'][camera_name] = {
-                'id': camera['id'],
-                'resolution': camera['resolution'],
-                'fps': camera['fps'],
-                'frame_age': frame_age,
-                'has_frame': camera['latest_frame'] is not None
-            }
+            camera_status = cameras.setdefault(camera_name, {})
+            camera_status['id'] = camera['id']
+            camera_status['resolution'] = camera['resolution']
+            camera_status['fps'] = camera['fps']
+            camera_status['frame_age'] = int(now_ns - timestamp) / 1e9 if timestamp > 0 else None
+            camera_status['has_frame'] = self._active[idx] >= 0
         
         return status
     
+    def publish_status(self, page: Dict[str, Any], key: str):
+        """Publish a camera status snapshot into a shared status page.
+        
+        The snapshot is a new dictionary stored with one item assignment,
+        so readers of the page never see a partly written entry.
+        
+        Args:
+            page: Shared status page
+            key: Slot of this controller in the page
+        """
+        page[key] = self.get_status()
+    
     def shutdown(self):
         """Shutdown camera controller."""
-        for camera_name, camera in self.cameras.items():
-            cap = camera['capture']
+        for camera_name, cap in zip(self._names, self._caps):
             if cap.isOpened():
                 cap.release()
             self.logger.info(f"Camera {camera_name} released")
         
+        if self._pool:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        
+        # Let queued saves finish before the controller goes away
+        if self._writer:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+        
         self.cameras.clear()
+        self._names = []
+        self._name_to_idx = {}
+        self._caps = []
+        self._slots = []
+        self._active = []
+        self._timestamps = np.zeros(0, dtype=np.int64)
+        self._frame_periods = np.zeros(0, dtype=np.int64)
         self.is_initialized = False
+        self.rt_log.close()
         self.logger.info("Camera controller shutdown complete") 
\ No newline at end of file
@@ -3,12 +3,110 @@ Dynamixel Controller - Interface for Dynamixel servo motors.
 """
 
 import time
+import struct
+import threading
 from typing import Dict, List, Any, Optional
 from dynamixel_sdk import *
 
 from utils.logger import setup_logger
 
 
+# Dynamixel Protocol 2.0 framing
+PACKET_HEADER = bytes([0xFF, 0xFF, 0xFD, 0x00])
+BROADCAST_ID = 0xFE
+INST_WRITE = 0x03
+INST_SYNC_WRITE = 0x83
+SYNC_WRITE_DATA_LENGTH = 4
+
+# Sends of the confirming stop before an emergency stop is reported failed
+ESTOP_ATTEMPTS = 5
+
+# Little-endian int32, the layout of 4-byte control table values
+INT32 = struct.Struct('<i')
+
+
+def _build_crc_table() -> List[int]:
+    """Lookup table for the CRC-16 (polynomial 0x8005) Protocol 2.0 uses."""
+    table = []
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = (crc << 1) ^ 0x8005 if crc & 0x8000 else crc << 1
+        table.append(crc & 0xFFFF)
+    return table
+
+
+_CRC_TABLE = _build_crc_table()
+
+
+def _crc16(data: bytes) -> int:
+    """Compute the Protocol 2.0 CRC over a packet without its CRC field."""
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC_TABLE[((crc >> 8) ^ byte) & 0xFF]
+    return crc
+
+
+def _build_packet(dxl_id: int, instruction: int, params: bytes) -> bytes:
+    """Serialize a complete Protocol 2.0 instruction packet.
+    
+    Byte stuffing is not applied, so params must not contain FF FF FD.
+    
+    Args:
+        dxl_id: Target motor ID or BROADCAST_ID
+        instruction: Instruction code
+        params: Instruction parameters
+        
+    Returns:
+        Packet bytes including header and CRC
+    """
+    length = len(params) + 3
+    body = PACKET_HEADER + bytes([dxl_id, length & 0xFF, length >> 8, instruction]) + params
+    crc = _crc16(body)
+    return body + bytes([crc & 0xFF, crc >> 8])
+
+
+class _SyncWritePacket:
+    """Pre-serialized SYNC_WRITE packet for a fixed set of motor IDs.
+    
+    Header, IDs and length fields are laid out once; each send only packs
+    the 4-byte values into their slots and recomputes the CRC.
+    """
+    
+    __slots__ = ('buffer', 'offsets')
+    
+    def __init__(self, address: int, motor_ids: List[int]):
+        params = bytearray(address.to_bytes(2, 'little') +
+                           SYNC_WRITE_DATA_LENGTH.to_bytes(2, 'little'))
+        self.offsets = []
+        for motor_id in motor_ids:
+            params.append(motor_id)
+            self.offsets.append(len(PACKET_HEADER) + 4 + len(params))
+            params.extend(bytes(SYNC_WRITE_DATA_LENGTH))
+        self.buffer = bytearray(_build_packet(BROADCAST_ID, INST_SYNC_WRITE, bytes(params)))
+    
+    def fill(self, values) -> Optional[bytearray]:
+        """Pack values into the packet and update its CRC.
+        
+        Args:
+            values: Goal values in the order of the motor IDs
+            
+        Returns:
+            The packet, or None if the values would need byte stuffing
+        """
+        buffer = self.buffer
+        pack_into = INT32.pack_into
+        for offset, value in zip(self.offsets, values):
+            pack_into(buffer, offset, value)
+        
+        if buffer.find(b'\xff\xff\xfd', len(PACKET_HEADER), len(buffer) - 2) != -1:
+            return None
+        crc = _crc16(memoryview(buffer)[:-2])
+        buffer[-2] = crc & 0xFF
+        buffer[-1] = crc >> 8
+        return buffer
+
+
 class DynamixelController:
     """Controller for Dynamixel servo motors."""
     
@@ -19,6 +117,19 @@ class DynamixelController:
     ADDR_GOAL_VELOCITY = 104
     ADDR_PRESENT_VELOCITY = 128
     ADDR_PRESENT_TEMPERATURE = 146
+    ADDR_STATUS_RETURN_LEVEL = 68
+    ADDR_BAUD_RATE = 8
+    ADDR_RETURN_DELAY_TIME = 9
+    
+    # Baud Rate register values by bits per second (X-series)
+    BAUD_RATE_CODES = {
+        9600: 0, 57600: 1, 115200: 2, 1000000: 3,
+        2000000: 4, 3000000: 5, 4000000: 6, 4500000: 7
+    }
+    
+    # Status return levels
+    STATUS_RETURN_READ = 1   # reply to reads and pings only
+    STATUS_RETURN_ALL = 2
     
     def __init__(self, config: Dict[str, Any]):
         """Initialize Dynamixel controller.
@@ -34,6 +145,36 @@ class DynamixelController:
         self.motors: Dict[str, Dict] = {}
         self.is_initialized = False
         
+        # The SDK port handler is not thread-safe and the bus is half-duplex,
+        # so every transaction on it (sensor reads from the poller thread,
+        # goal writes from the control thread, emergency stops) holds this
+        # lock; reentrant because reads can trigger a bulk refresh
+        self._port_lock = threading.RLock()
+        
+        # Broadcast "goal velocity = 0" packet, serialized once at init
+        self._stop_packet: Optional[bytes] = None
+        
+        # SYNC_WRITE packets keyed by (address, motor names)
+        self._sync_write_packets: Dict[tuple, _SyncWritePacket] = {}
+        
+        # (ID, value) parameter block for SDK sync writes, used when a
+        # pre-serialized packet cannot be sent; grown as needed
+        self._sync_params = bytearray()
+        self._zero_velocities: Dict[str, int] = {}
+        
+        # Whether writes get a status reply; when they don't, single-motor
+        # writes are sent without waiting for one
+        self._write_acked = True
+        
+        # Reads present velocity and position (adjacent registers) of every
+        # motor in one transaction; Protocol 2.0 only
+        self._bulk_read = None
+        
+        # Control tick counter; sensor readings taken during the current
+        # tick are served from self.motors instead of re-reading the bus
+        self._sensor_tick = 0
+        self._last_refresh_tick = -1
+        
     def initialize(self):
         """Initialize Dynamixel communication."""
         try:
@@ -49,9 +190,22 @@ class DynamixelController:
             if not self.port_handler.setBaudRate(self.config['baudrate']):
                 raise Exception(f"Failed to set baudrate {self.config['baudrate']}")
             
+            self._configure_bus()
+            
             # Initialize motors
             self._initialize_motors()
             
+            if float(self.config['protocol_version']) == 2.0:
+                self._stop_packet = _build_packet(
+                    BROADCAST_ID, INST_WRITE,
+                    self.ADDR_GOAL_VELOCITY.to_bytes(2, 'little') + (0).to_bytes(4, 'little')
+                )
+                
+                self._bulk_read = GroupBulkRead(self.port_handler, self.packet_handler)
+                for motor_name, motor_info in self.motors.items():
+                    if not self._bulk_read.addParam(motor_info['id'], self.ADDR_PRESENT_VELOCITY, 8):
+                        raise Exception(f"Failed to add motor {motor_name} to bulk read")
+            
             self.is_initialized = True
             self.logger.info("Dynamixel controller initialized successfully")
             
@@ -59,18 +213,128 @@ class DynamixelController:
             self.logger.error(f"Failed to initialize Dynamixel controller: {e}")
             raise
     
+    def _configure_bus(self):
+        """Apply the return_delay_time and target_baudrate options.
+        
+        Both registers are in EEPROM, so they persist across power cycles.
+        They are only written when they differ, and torque is disabled
+        only on the motors being written, as EEPROM writes require, so
+        joints are not dropped on startups that change nothing. Protocol
+        2.0 only.
+        """
+        return_delay_time = self.config.get('return_delay_time')
+        target_baudrate = self.config.get('target_baudrate')
+        if return_delay_time is None and not target_baudrate:
+            return
+        
+        if float(self.config['protocol_version']) != 2.0:
+            self.logger.warning("return_delay_time and target_baudrate require Protocol 2.0, ignoring")
+            return
+        
+        switch_baudrate = bool(target_baudrate) and target_baudrate != self.config['baudrate']
+        if switch_baudrate:
+            if target_baudrate not in self.BAUD_RATE_CODES:
+                raise Exception(f"Unsupported target baudrate {target_baudrate}")
+            
+            # Motors keep the new rate, so after the first switch they
+            # already answer at the target rate
+            if not self.port_handler.setBaudRate(target_baudrate):
+                raise Exception(f"Failed to set baudrate {target_baudrate}")
+            if self._all_motors_present():
+                switch_baudrate = False
+            else:
+                self.port_handler.setBaudRate(self.config['baudrate'])
+        
+        if return_delay_time is not None:
+            for motor_name, motor_config in self.config['motors'].items():
+                self._set_return_delay_time(motor_name, motor_config['id'], return_delay_time)
+        
+        if switch_baudrate:
+            self.packet_handler.write1ByteTxOnly(self.port_handler, BROADCAST_ID, self.ADDR_TORQUE_ENABLE, 0)
+            self.packet_handler.write1ByteTxOnly(
+                self.port_handler, BROADCAST_ID, self.ADDR_BAUD_RATE, self.BAUD_RATE_CODES[target_baudrate]
+            )
+            # Give the motors time to store the rate and switch to it
+            time.sleep(0.1)
+            
+            if not self.port_handler.setBaudRate(target_baudrate):
+                raise Exception(f"Failed to set baudrate {target_baudrate}")
+            self.logger.info(f"Dynamixel bus switched to {target_baudrate} bps")
+    
+    def _set_return_delay_time(self, motor_name: str, motor_id: int, return_delay_time: int):
+        """Write a motor's Return Delay Time register if it differs.
+        
+        Torque is disabled on the motor just before the write, since the
+        register is in EEPROM; _initialize_motors enables it again. The
+        write waits for the motor's status reply, so it cannot collide
+        with the next motor's read on the half-duplex bus. A motor left at
+        status return level 1 by an earlier run does not reply to writes,
+        so a write without a reply is checked by reading the register back.
+        
+        Args:
+            motor_name: Motor name for log messages
+            motor_id: Motor ID
+            return_delay_time: Register value, in 2 us units
+        """
+        current, dxl_comm_result, dxl_error = self.packet_handler.read1ByteTxRx(
+            self.port_handler, motor_id, self.ADDR_RETURN_DELAY_TIME
+        )
+        if dxl_comm_result != COMM_SUCCESS or dxl_error != 0:
+            self.logger.warning(f"Failed to read return delay time of motor {motor_name}")
+            return
+        if current == return_delay_time:
+            return
+        
+        # A motor at status return level 1 does not reply, so the result
+        # is not checked; the read back below confirms the write
+        self.packet_handler.write1ByteTxRx(self.port_handler, motor_id, self.ADDR_TORQUE_ENABLE, 0)
+        
+        dxl_comm_result, dxl_error = self.packet_handler.write1ByteTxRx(
+            self.port_handler, motor_id, self.ADDR_RETURN_DELAY_TIME, return_delay_time
+        )
+        if dxl_comm_result != COMM_SUCCESS or dxl_error != 0:
+            current, dxl_comm_result, dxl_error = self.packet_handler.read1ByteTxRx(
+                self.port_handler, motor_id, self.ADDR_RETURN_DELAY_TIME
+            )
+            if dxl_comm_result != COMM_SUCCESS or dxl_error != 0 or current != return_delay_time:
+                self.logger.warning(f"Failed to set return delay time of motor {motor_name}")
+                return
+        
+        self.logger.info(f"Motor {motor_name} return delay time set to {return_delay_time * 2} us")
+    
+    def _all_motors_present(self) -> bool:
+        """Check with one broadcast ping that every configured motor answers.
+        
+        Returns:
+            True if all configured motor IDs replied
+        """
+        present, dxl_comm_result = self.packet_handler.broadcastPing(self.port_handler)
+        if dxl_comm_result != COMM_SUCCESS:
+            return False
+        return all(motor_config['id'] in present for motor_config in self.config['motors'].values())
+    
     def _initialize_motors(self):
         """Initialize individual motors."""
+        protocol2 = float(self.config['protocol_version']) == 2.0
+        
+        # Broadcast writes get no status reply, so check the motors are
+        # there first; Protocol 2.0 finds every motor with one broadcast ping
+        present = None
+        if protocol2:
+            present, dxl_comm_result = self.packet_handler.broadcastPing(self.port_handler)
+            if dxl_comm_result != COMM_SUCCESS:
+                raise Exception("Broadcast ping failed")
+        
         for motor_name, motor_config in self.config['motors'].items():
             motor_id = motor_config['id']
             
-            # Enable torque
-            dxl_comm_result, dxl_error = self.packet_handler.write1ByteTxRx(
-                self.port_handler, motor_id, self.ADDR_TORQUE_ENABLE, 1
-            )
+            if present is not None:
+                dxl_comm_result = COMM_SUCCESS if motor_id in present else COMM_RX_TIMEOUT
+            else:
+                _, dxl_comm_result, dxl_error = self.packet_handler.ping(self.port_handler, motor_id)
             
             if dxl_comm_result != COMM_SUCCESS:
-                raise Exception(f"Failed to enable torque for motor {motor_name}")
+                raise Exception(f"Failed to reach motor {motor_name}")
             
             # Store motor info
             self.motors[motor_name] = {
@@ -82,6 +346,39 @@ class DynamixelController:
             }
             
             self.logger.info(f"Motor {motor_name} (ID: {motor_id}) initialized")
+        
+        # Enable torque on all motors with one broadcast packet
+        if self.motors and self.packet_handler.write1ByteTxOnly(
+            self.port_handler, BROADCAST_ID, self.ADDR_TORQUE_ENABLE, 1
+        ) != COMM_SUCCESS:
+            raise Exception("Failed to enable torque")
+        
+        self._zero_velocities = {motor_name: 0 for motor_name in self.motors}
+        
+        if self.motors and protocol2:
+            self._set_status_return_level(
+                self.STATUS_RETURN_ALL if self.config.get('reply_on_write', False) else self.STATUS_RETURN_READ
+            )
+    
+    def _set_status_return_level(self, level: int):
+        """Set the status return level of all motors.
+        
+        The register is in RAM, so it is written on every initialization.
+        It goes out as one sync write, which gets no reply regardless of
+        the level the motors are currently at.
+        
+        Args:
+            level: STATUS_RETURN_READ or STATUS_RETURN_ALL
+        """
+        status_return = GroupSyncWrite(self.port_handler, self.packet_handler, self.ADDR_STATUS_RETURN_LEVEL, 1)
+        for motor_info in self.motors.values():
+            status_return.addParam(motor_info['id'], [level])
+        
+        if status_return.txPacket() != COMM_SUCCESS:
+            raise Exception("Failed to set status return level")
+        
+        self._write_acked = level == self.STATUS_RETURN_ALL
+        self.logger.info(f"Motor status return level set to {level}")
     
     def set_position(self, motor_name: str, position: int):
         """Set target position for a motor.
@@ -96,12 +393,18 @@ class DynamixelController:
         motor_id = self.motors[motor_name]['id']
         
         # Write goal position
-        dxl_comm_result, dxl_error = self.packet_handler.write4ByteTxRx(
-            self.port_handler, motor_id, self.ADDR_GOAL_POSITION, position
-        )
+        with self._port_lock:
+            if self._write_acked:
+                dxl_comm_result, dxl_error = self.packet_handler.write4ByteTxRx(
+                    self.port_handler, motor_id, self.ADDR_GOAL_POSITION, position
+                )
+            else:
+                dxl_comm_result = self.packet_handler.write4ByteTxOnly(
+                    self.port_handler, motor_id, self.ADDR_GOAL_POSITION, position
+                )
         
         if dxl_comm_result != COMM_SUCCESS:
-            self.logger.error(f"Failed to set position for motor {motor_name}")
+            self.logger.error("Failed to set position for motor %s", motor_name)
             return False
         
         return True
@@ -119,12 +422,18 @@ class DynamixelController:
         motor_id = self.motors[motor_name]['id']
         
         # Write goal velocity
-        dxl_comm_result, dxl_error = self.packet_handler.write4ByteTxRx(
-            self.port_handler, motor_id, self.ADDR_GOAL_VELOCITY, velocity
-        )
+        with self._port_lock:
+            if self._write_acked:
+                dxl_comm_result, dxl_error = self.packet_handler.write4ByteTxRx(
+                    self.port_handler, motor_id, self.ADDR_GOAL_VELOCITY, velocity
+                )
+            else:
+                dxl_comm_result = self.packet_handler.write4ByteTxOnly(
+                    self.port_handler, motor_id, self.ADDR_GOAL_VELOCITY, velocity
+                )
         
         if dxl_comm_result != COMM_SUCCESS:
-            self.logger.error(f"Failed to set velocity for motor {motor_name}")
+            self.logger.error("Failed to set velocity for motor %s", motor_name)
             return False
         
         return True
@@ -141,12 +450,18 @@ class DynamixelController:
         if not self.is_initialized or motor_name not in self.motors:
             return None
         
+        if self._bulk_read is not None:
+            if self._last_refresh_tick != self._sensor_tick and not self.update_all_sensors():
+                return None
+            return self.motors[motor_name]['position']
+        
         motor_id = self.motors[motor_name]['id']
         
         # Read present position
-        position, dxl_comm_result, dxl_error = self.packet_handler.read4ByteTxRx(
-            self.port_handler, motor_id, self.ADDR_PRESENT_POSITION
-        )
+        with self._port_lock:
+            position, dxl_comm_result, dxl_error = self.packet_handler.read4ByteTxRx(
+                self.port_handler, motor_id, self.ADDR_PRESENT_POSITION
+            )
         
         if dxl_comm_result != COMM_SUCCESS:
             return None
@@ -166,12 +481,18 @@ class DynamixelController:
         if not self.is_initialized or motor_name not in self.motors:
             return None
         
+        if self._bulk_read is not None:
+            if self._last_refresh_tick != self._sensor_tick and not self.update_all_sensors():
+                return None
+            return self.motors[motor_name]['velocity']
+        
         motor_id = self.motors[motor_name]['id']
         
         # Read present velocity
-        velocity, dxl_comm_result, dxl_error = self.packet_handler.read4ByteTxRx(
-            self.port_handler, motor_id, self.ADDR_PRESENT_VELOCITY
-        )
+        with self._port_lock:
+            velocity, dxl_comm_result, dxl_error = self.packet_handler.read4ByteTxRx(
+                self.port_handler, motor_id, self.ADDR_PRESENT_VELOCITY
+            )
         
         if dxl_comm_result != COMM_SUCCESS:
             return None
@@ -179,11 +500,121 @@ class DynamixelController:
         self.motors[motor_name]['velocity'] = velocity
         return velocity
     
-    def update_all_sensors(self):
-        """Update sensor readings for all motors."""
-        for motor_name in self.motors.keys():
-            self.get_position(motor_name)
-            self.get_velocity(motor_name)
+    def next_tick(self):
+        """Start a new control tick, invalidating cached sensor readings."""
+        self._sensor_tick += 1
+    
+    def update_all_sensors(self) -> bool:
+        """Update sensor readings for all motors.
+        
+        Returns:
+            True if the readings were updated
+        """
+        if not self.is_initialized:
+            return False
+        
+        bulk_read = self._bulk_read
+        if bulk_read is None:
+            for motor_name in self.motors.keys():
+                self.get_position(motor_name)
+                self.get_velocity(motor_name)
+            return True
+        
+        with self._port_lock:
+            if bulk_read.txRxPacket() != COMM_SUCCESS:
+                return False
+            
+            for motor_info in self.motors.values():
+                motor_id = motor_info['id']
+                if bulk_read.isAvailable(motor_id, self.ADDR_PRESENT_VELOCITY, 8):
+                    motor_info['velocity'] = bulk_read.getData(motor_id, self.ADDR_PRESENT_VELOCITY, 4)
+                    motor_info['position'] = bulk_read.getData(motor_id, self.ADDR_PRESENT_POSITION, 4)
+        
+        self._last_refresh_tick = self._sensor_tick
+        return True
+    
+    def _sync_write(self, address: int, values: Dict[str, int]) -> bool:
+        """Write one 4-byte register on several motors with a single packet.
+        
+        Args:
+            address: Control table address
+            values: Values by motor name
+            
+        Returns:
+            True if the packet was sent, False if the caller should fall
+            back to per-motor writes
+        """
+        if self._stop_packet is None or not values:
+            return False
+        
+        key = (address, tuple(values))
+        packet = self._sync_write_packets.get(key)
+        if packet is None:
+            if any(name not in self.motors for name in key[1]):
+                return False
+            packet = _SyncWritePacket(address, [self.motors[name]['id'] for name in key[1]])
+            self._sync_write_packets[key] = packet
+        
+        data = packet.fill(values.values())
+        port = self.port_handler
+        if data is None or port.is_using:
+            return False
+        
+        # Same framing as the SDK's txPacket, minus the per-call marshalling
+        port.is_using = True
+        try:
+            port.clearPort()
+            written = port.writePort(data)
+        finally:
+            port.is_using = False
+        
+        return written == len(data)
+    
+    def _write_goals(self, address: int, values: Dict[str, int]) -> bool:
+        """Write a 4-byte goal register on several motors in one transaction.
+        
+        Args:
+            address: Control table address
+            values: Values by motor name
+            
+        Returns:
+            True if the write was sent
+        """
+        with self._port_lock:
+            return self._write_goals_locked(address, values)
+    
+    def _write_goals_locked(self, address: int, values: Dict[str, int]) -> bool:
+        """_write_goals body; the caller holds the port lock."""
+        if self._sync_write(address, values):
+            return True
+        
+        # Pack the parameter block straight into a reused buffer and let the
+        # SDK frame it, which handles byte stuffing and Protocol 1.0
+        entry_size = 1 + SYNC_WRITE_DATA_LENGTH
+        params = self._sync_params
+        if len(params) < len(values) * entry_size:
+            params.extend(bytes(len(values) * entry_size - len(params)))
+        
+        offset = 0
+        for motor_name, value in values.items():
+            motor_info = self.motors.get(motor_name)
+            if motor_info is not None:
+                params[offset] = motor_info['id']
+                INT32.pack_into(params, offset + 1, value)
+                offset += entry_size
+        
+        if offset == 0:
+            return False
+        
+        result = self.packet_handler.syncWriteTxOnly(
+            self.port_handler, address, SYNC_WRITE_DATA_LENGTH, params, offset
+        )
+        
+        if result != COMM_SUCCESS:
+            self.logger.error("Failed to sync write address %s", address)
+            return False
+        
+        return True
     
     def execute_command(self, command: Dict[str, Any]):
         """Execute a movement command.
@@ -191,52 +622,107 @@ class DynamixelController:
         Args:
             command: Movement command dictionary
         """
-        if 'positions' in command:
-            for motor_name, position in command['positions'].items():
-                self.set_position(motor_name, position)
+        if not self.is_initialized:
+            return
         
-        if 'velocities' in command:
-            for motor_name, velocity in command['velocities'].items():
-                self.set_velocity(motor_name, velocity)
+        if command.get('positions'):
+            self._write_goals(self.ADDR_GOAL_POSITION, command['positions'])
+        
+        if command.get('velocities'):
+            self._write_goals(self.ADDR_GOAL_VELOCITY, command['velocities'])
+    
+    def stop_all_motors(self) -> bool:
+        """Stop all motors immediately.
+        
+        Returns:
+            True if the stop was sent
+        """
+        if self.is_initialized and self._zero_velocities:
+            return self._write_goals(self.ADDR_GOAL_VELOCITY, self._zero_velocities)
+        return False
     
-    def stop_all_motors(self):
-        """Stop all motors immediately."""
-        for motor_name in self.motors.keys():
-            self.set_velocity(motor_name, 0)
+    def emergency_stop(self) -> bool:
+        """Stop all motors, sending a pre-built broadcast stop packet first.
+        
+        Both writes happen under the port lock, so they wait for a bulk
+        read in flight on the sensor thread instead of colliding with its
+        status replies. The broadcast packet gets no status reply, so every
+        motor receives the stop after one write instead of after a
+        request/response round trip per motor. The regular stop follows to
+        confirm it and is retried until it is sent.
+        
+        Returns:
+            True if the stop was sent, False if every attempt failed
+        """
+        if not self.is_initialized:
+            return False
+        
+        with self._port_lock:
+            port = self.port_handler
+            if self._stop_packet is not None and not port.is_using:
+                port.is_using = True
+                try:
+                    port.clearPort()
+                    port.writePort(self._stop_packet)
+                finally:
+                    port.is_using = False
+            
+            for _ in range(ESTOP_ATTEMPTS):
+                if self.stop_all_motors():
+                    return True
+        
+        self.logger.error("Emergency stop could not be sent to the motors")
+        return False
     
-    def get_status(self) -> Dict[str, Any]:
+    def get_status(self, out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get status of all motors.
         
+        Positions and velocities are those read by the last
+        update_all_sensors call.
+        
+        Args:
+            out: Dictionary to fill in place instead of allocating a new one
+            
         Returns:
             Status dictionary
         """
-        status = {
-            'initialized': self.is_initialized,
-            'motors': {}
-        }
+        status = {} if out is None else out
+        status['initialized'] = self.is_initialized
+        motors = status.setdefault('motors', {})
         
         for motor_name, motor_info in self.motors.items():
-            status['motors'][motor_name] = {
-                'id': motor_info['id'],
-                'position': self.get_position(motor_name),
-                'velocity': self.get_velocity(motor_name)
-            }
+            motor_status = motors.setdefault(motor_name, {})
+            motor_status['id'] = motor_info['id']
+            motor_status['position'] = motor_info['position']
+            motor_status['velocity'] = motor_info['velocity']
         
         return status
     
+    def publish_status(self, page: Dict[str, Any], key: str):
+        """Publish a motor status snapshot into a shared status page.
+        
+        The snapshot is a new dictionary stored with one item assignment,
+        so readers of the page never see a partly written entry.
+        
+        Args:
+            page: Shared status page
+            key: Slot of this controller in the page
+        """
+        page[key] = self.get_status()
+    
     def shutdown(self):
         """Shutdown Dynamixel controller."""
         if self.is_initialized:
-            # Disable torque for all motors
-            for motor_name, motor_info in self.motors.items():
-                motor_id = motor_info['id']
-                self.packet_handler.write1ByteTxRx(
-                    self.port_handler, motor_id, self.ADDR_TORQUE_ENABLE, 0
-                )
-            
-            # Close port
-            if self.port_handler:
-                self.port_handler.closePort()
+            with self._port_lock:
+                # Disable torque for all motors with one broadcast packet
+                if self.motors:
+                    self.packet_handler.write1ByteTxOnly(
+                        self.port_handler, BROADCAST_ID, self.ADDR_TORQUE_ENABLE, 0
+                    )
+                
+                # Close port
+                if self.port_handler:
+                    self.port_handler.closePort()
             
             self.is_initialized = False
             self.logger.info("Dynamixel controller shutdown complete") 
\ No newline at end of file
@@ -9,6 +9,47 @@ from typing import Dict, List, Any, Optional, Tuple
 from rplidar import RPLidar
 
 from utils.logger import setup_logger
+from utils.scheduling import reset_thread_scheduling
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+# Scan array columns
+QUALITY, ANGLE, DISTANCE = 0, 1, 2
+
+# Upper bound on points per revolution; RPLiDAR A1-A3 produce well under this
+MAX_SCAN_POINTS = 2048
+
+
+def _filter_scan(points: np.ndarray, max_distance_mm: float, out: np.ndarray) -> int:
+    """Copy the points passing the quality and distance filter into out.
+    
+    Single pass with no intermediate arrays; compiled with Numba when it
+    is installed.
+    
+    Args:
+        points: Raw (quality, angle, distance in mm) rows
+        max_distance_mm: Exclusive upper distance bound
+        out: Array with at least as many rows as points
+        
+    Returns:
+        Number of rows written, with distances converted to meters
+    """
+    n = 0
+    for i in range(points.shape[0]):
+        distance = points[i, 2]
+        if points[i, 0] > 10 and 0.1 < distance < max_distance_mm:
+            out[n, 0] = points[i, 0]
+            out[n, 1] = points[i, 1]
+            out[n, 2] = distance / 1000.0
+            n += 1
+    return n
+
+
+_filter_scan_jit = njit(cache=True)(_filter_scan) if njit is not None else None
 
 
 class LidarController:
@@ -27,11 +68,27 @@ class LidarController:
         self.is_initialized = False
         self.is_scanning = False
         
-        # Scan data
-        self.scan_data: List[Tuple[float, float, float]] = []  # (quality, angle, distance)
-        self.scan_lock = threading.Lock()
+        # Scan data, one (quality, angle, distance) row per point. Each scan
+        # is a new read-only array published by a single reference
+        # assignment, so readers need neither a lock nor a copy
+        self.scan_data: np.ndarray = np.empty((0, 3), dtype=np.float32)
+        self.scan_data.flags.writeable = False
         self.scan_thread: Optional[threading.Thread] = None
         
+        # Staging buffers the scan loop converts and filters each revolution
+        # in, so only the published scan array is allocated per revolution
+        self._raw_scan = np.empty((MAX_SCAN_POINTS, 3), dtype=np.float32)
+        self._keep = np.empty(MAX_SCAN_POINTS, dtype=bool)
+        self._mask = np.empty(MAX_SCAN_POINTS, dtype=bool)
+        self._filtered = np.empty((MAX_SCAN_POINTS, 3), dtype=np.float32)
+        
+        # (scan, {query key: result}) for the last scan queried; replaced as
+        # one tuple so a result is never filed under another scan
+        self._query_cache: Tuple[Optional[np.ndarray], Dict[tuple, Any]] = (None, {})
+        
+        # (scan, (min, max, avg) distance) for the last scan get_status saw
+        self._scan_stats: Optional[Tuple[np.ndarray, Tuple[float, float, float]]] = None
+        
     def initialize(self):
         """Initialize LiDAR communication."""
         try:
@@ -49,6 +106,10 @@ class LidarController:
             if health[0] != 'Good':
                 self.logger.warning(f"LiDAR health status: {health}")
             
+            # Compile the scan filter now rather than on the first scan
+            if _filter_scan_jit is not None:
+                _filter_scan_jit(self._raw_scan[:1], 0.0, self._filtered)
+            
             self.is_initialized = True
             self.logger.info("LiDAR controller initialized successfully")
             
@@ -91,35 +152,58 @@ class LidarController:
     
     def _scan_loop(self):
         """Main scanning loop running in separate thread."""
+        # Started from the control loop; do not inherit its SCHED_FIFO and CPU pin
+        reset_thread_scheduling()
+        
+        # Loop invariants bound once, outside the per-revolution body
+        max_distance_mm = float(self.config.get('max_distance', 12.0)) * 1000.0
+        raw_scan, keep_buffer, mask_buffer = self._raw_scan, self._keep, self._mask
+        filtered, filter_scan = self._filtered, _filter_scan_jit
+        greater, less = np.greater, np.less
+        
         try:
             for scan in self.lidar.iter_scans():
                 if not self.is_scanning:
                     break
                 
-                # Filter and process scan data
-                filtered_scan = []
-                for quality, angle, distance in scan:
-                    # Filter by quality and distance
-                    if (quality > 10 and 
-                        0.1 < distance < self.config.get('max_distance', 12.0) * 1000):
-                        filtered_scan.append((quality, angle, distance / 1000.0))  # Convert to meters
+                count = min(len(scan), MAX_SCAN_POINTS)
+                if count == 0:
+                    continue
+                
+                points = raw_scan[:count]
+                points[:] = scan[:count]
                 
-                # Update scan data thread-safely
-                with self.scan_lock:
-                    self.scan_data = filtered_scan
+                # Filter by quality and distance
+                if filter_scan is not None:
+                    filtered_scan = filtered[:filter_scan(points, max_distance_mm, filtered)].copy()
+                else:
+                    keep = keep_buffer[:count]
+                    mask = mask_buffer[:count]
+                    distances = points[:, DISTANCE]
+                    greater(points[:, QUALITY], 10, out=keep)
+                    greater(distances, 0.1, out=mask)
+                    keep &= mask
+                    less(distances, max_distance_mm, out=mask)
+                    keep &= mask
+                    
+                    filtered_scan = points[keep]
+                    filtered_scan[:, DISTANCE] /= 1000.0  # Convert to meters
+                filtered_scan.flags.writeable = False
+                
+                self.scan_data = filtered_scan
                 
         except Exception as e:
             self.logger.error(f"Error in LiDAR scan loop: {e}")
             self.is_scanning = False
     
-    def get_scan_data(self) -> List[Tuple[float, float, float]]:
+    def get_scan_data(self) -> np.ndarray:
         """Get latest scan data.
         
         Returns:
-            List of (quality, angle, distance) tuples
+            Read-only array of (quality, angle, distance) rows, shared with
+            other readers; copy it before modifying
         """
-        with self.scan_lock:
-            return self.scan_data.copy()
+        return self.scan_data
     
     def get_cartesian_points(self) -> np.ndarray:
         """Get scan data as Cartesian coordinates.
@@ -129,42 +213,54 @@ class LidarController:
         """
         scan_data = self.get_scan_data()
         
-        if not scan_data:
-            return np.array([]).reshape(0, 2)
-        
-        points = []
-        for quality, angle, distance in scan_data:
-            # Convert polar to Cartesian coordinates
-            angle_rad = np.radians(angle)
-            x = distance * np.cos(angle_rad)
-            y = distance * np.sin(angle_rad)
-            points.append([x, y])
+        # Convert polar to Cartesian coordinates
+        angles = np.radians(scan_data[:, ANGLE])
+        distances = scan_data[:, DISTANCE]
+        return np.stack((distances * np.cos(angles), distances * np.sin(angles)), axis=1)
+    
+    def _queries_for(self, scan_data: np.ndarray) -> Dict[tuple, Any]:
+        """Get the query result cache for a scan, starting a new one per scan.
         
-        return np.array(points)
+        Args:
+            scan_data: Scan the queries run against
+            
+        Returns:
+            Dictionary of results by query key
+        """
+        cached_scan, cache = self._query_cache
+        if cached_scan is not scan_data:
+            cache = {}
+            self._query_cache = (scan_data, cache)
+        return cache
     
-    def get_obstacles_in_direction(self, target_angle: float, angle_tolerance: float = 10.0) -> List[float]:
+    def get_obstacles_in_direction(self, target_angle: float, angle_tolerance: float = 10.0) -> np.ndarray:
         """Get obstacles in a specific direction.
         
+        Results are cached per scan, so repeated queries with the same
+        arguments between two scans are computed once.
+        
         Args:
             target_angle: Target angle in degrees
             angle_tolerance: Tolerance in degrees
             
         Returns:
-            List of distances to obstacles in the specified direction
+            Read-only sorted array of distances to obstacles in the specified direction
         """
         scan_data = self.get_scan_data()
-        obstacles = []
+        cache = self._queries_for(scan_data)
+        key = ('obstacles', target_angle, angle_tolerance)
+        obstacles = cache.get(key)
+        if obstacles is not None:
+            return obstacles
         
-        for quality, angle, distance in scan_data:
-            angle_diff = abs(angle - target_angle)
-            # Handle angle wraparound
-            if angle_diff > 180:
-                angle_diff = 360 - angle_diff
-            
-            if angle_diff <= angle_tolerance:
-                obstacles.append(distance)
+        angle_diff = np.abs(scan_data[:, ANGLE] - target_angle)
+        # Handle angle wraparound: the shorter way round is the smaller of the two
+        angle_diff = np.minimum(angle_diff, 360 - angle_diff)
         
-        return sorted(obstacles)
+        obstacles = np.sort(scan_data[angle_diff <= angle_tolerance, DISTANCE])
+        obstacles.flags.writeable = False
+        cache[key] = obstacles
+        return obstacles
     
     def get_closest_obstacle(self) -> Optional[Tuple[float, float, float]]:
         """Get the closest obstacle.
@@ -174,15 +270,18 @@ class LidarController:
         """
         scan_data = self.get_scan_data()
         
-        if not scan_data:
+        if len(scan_data) == 0:
             return None
         
-        closest = min(scan_data, key=lambda x: x[2])  # Sort by distance
-        return (closest[1], closest[2], closest[0])  # (angle, distance, quality)
+        quality, angle, distance = scan_data[np.argmin(scan_data[:, DISTANCE])]
+        return (float(angle), float(distance), float(quality))
     
     def is_path_clear(self, start_angle: float, end_angle: float, min_distance: float = 0.5) -> bool:
         """Check if a path is clear of obstacles.
         
+        Results are cached per scan, so repeated queries with the same
+        arguments between two scans are computed once.
+        
         Args:
             start_angle: Start angle in degrees
             end_angle: End angle in degrees
@@ -194,45 +293,71 @@ class LidarController:
         scan_data = self.get_scan_data()
         
         # Normalize angles
-        if start_angle > end_angle:
-            start_angle, end_angle = end_angle, start_angle
+        start_angle, end_angle = min(start_angle, end_angle), max(start_angle, end_angle)
         
-        for quality, angle, distance in scan_data:
-            if start_angle <= angle <= end_angle and distance < min_distance:
-                return False
+        cache = self._queries_for(scan_data)
+        key = ('path_clear', start_angle, end_angle, min_distance)
+        clear = cache.get(key)
+        if clear is not None:
+            return clear
         
-        return True
+        angles = scan_data[:, ANGLE]
+        blocked = (angles >= start_angle) & (angles <= end_angle) & (scan_data[:, DISTANCE] < min_distance)
+        clear = not blocked.any()
+        cache[key] = clear
+        return clear
     
     def update(self):
         """Update LiDAR data - called from main loop."""
         if not self.is_scanning:
             self.start_scanning()
     
-    def get_status(self) -> Dict[str, Any]:
+    def get_status(self, out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get LiDAR status.
         
+        Distance statistics are computed once per scan and reused until the
+        scan loop publishes the next one.
+        
+        Args:
+            out: Dictionary to fill in place instead of allocating a new one
+            
         Returns:
             Status dictionary
         """
-        scan_data = self.get_scan_data()
+        scan_data = self.scan_data
         
-        status = {
-            'initialized': self.is_initialized,
-            'scanning': self.is_scanning,
-            'scan_points': len(scan_data),
-            'timestamp': time.time()
-        }
-        
-        if scan_data:
-            distances = [d for _, _, d in scan_data]
-            status.update({
-                'min_distance': min(distances),
-                'max_distance': max(distances),
-                'avg_distance': sum(distances) / len(distances)
-            })
+        status = {} if out is None else out
+        status['initialized'] = self.is_initialized
+        status['scanning'] = self.is_scanning
+        status['scan_points'] = len(scan_data)
+        status['timestamp'] = time.time()
+        
+        if len(scan_data):
+            cached = self._scan_stats
+            if cached is None or cached[0] is not scan_data:
+                distances = scan_data[:, DISTANCE]
+                cached = (scan_data, (float(distances.min()), float(distances.max()), float(distances.mean())))
+                self._scan_stats = cached
+            
+            status['min_distance'], status['max_distance'], status['avg_distance'] = cached[1]
+        else:
+            for key in ('min_distance', 'max_distance', 'avg_distance'):
+                status.pop(key, None)
         
         return status
     
+    def publish_status(self, page: Dict[str, Any], key: str):
+        """Publish a LiDAR status snapshot into a shared status page.
+        
+        The snapshot is a new dictionary stored with one item assignment,
+        so readers of the page never see a partly written entry.
+        
+        Args:
+            page: Shared status page
+            key: Slot of this controller in the page
+        """
+        page[key] = self.get_status()
+    
     def shutdown(self):
         """Shutdown LiDAR controller."""
         self.stop_scanning()
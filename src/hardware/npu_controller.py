@@ -2,12 +2,23 @@
 NPU Controller - Interface for Neural Processing Units.
 """
 
+import os
 import time
+import queue
+import threading
 import numpy as np
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 
 from utils.logger import setup_logger
+from utils.scheduling import reset_thread_scheduling
+
+# Only needed to resize inputs; inference backends are imported by the
+# _initialize_* method that uses them
+try:
+    import cv2
+except ImportError:
+    cv2 = None
 
 
 class NPUController:
@@ -24,12 +35,31 @@ class NPUController:
         
         self.npu_type = config.get('type', 'cpu')
         self.model_path = config.get('model_path', '')
+        self.num_threads = config.get('num_threads', 0) or os.cpu_count() or 1
         
         self.interpreter = None
         self.input_details = None
         self.output_details = None
         self.is_initialized = False
         
+        # Cleared once the interpreter refuses to resize its input, as
+        # fixed-shape Edge TPU models do
+        self._batching_supported = True
+        
+        # Preprocessing buffers by name, reused across inferences so the
+        # hot path does not allocate a frame-sized array per call
+        self._buffers: Dict[str, np.ndarray] = {}
+        
+        # The interpreter is not thread-safe; held around each invoke
+        self._interpreter_lock = threading.Lock()
+        
+        # Asynchronous detection: a single-slot queue where the newest image
+        # replaces one not yet picked up, and the latest result per key
+        self._infer_in: queue.Queue = queue.Queue(maxsize=1)
+        self._infer_out: Dict[str, List[Dict[str, Any]]] = {}
+        self._infer_thread: Optional[threading.Thread] = None
+        self._infer_running = False
+        
     def initialize(self):
         """Initialize NPU and load models."""
         try:
@@ -88,14 +118,19 @@ class NPUController:
         try:
             import tensorflow as tf
             
-            # Load TensorFlow Lite model for CPU inference
+            # Load TensorFlow Lite model for CPU inference. Recent TFLite
+            # builds apply the XNNPACK delegate (NEON/AVX SIMD kernels) by
+            # default, which only parallelizes when given threads
             if Path(self.model_path).exists():
-                self.interpreter = tf.lite.Interpreter(model_path=self.model_path)
+                self.interpreter = tf.lite.Interpreter(
+                    model_path=self.model_path,
+                    num_threads=self.num_threads
+                )
                 self.interpreter.allocate_tensors()
                 self.input_details = self.interpreter.get_input_details()
                 self.output_details = self.interpreter.get_output_details()
             
-            self.logger.info("CPU inference initialized")
+            self.logger.info(f"CPU inference initialized ({self.num_threads} threads)")
             
         except ImportError:
             self.logger.warning("TensorFlow not available, NPU disabled")
@@ -112,15 +147,34 @@ class NPUController:
         if not self.is_initialized or self.interpreter is None:
             return None
         
+        with self._interpreter_lock:
+            return self._run_inference(input_data)
+    
+    def _run_inference(self, input_data: np.ndarray) -> Optional[np.ndarray]:
+        """Run inference on input data with the interpreter lock held.
+        
+        Args:
+            input_data: Input data as numpy array
+            
+        Returns:
+            Inference results or None if error
+        """
         try:
-            # Prepare input data
+            # A previous batched call may have left the input resized
+            if self._batching_supported:
+                self._resize_batch(1)
+            
+            # Prepare input data directly in the interpreter's input tensor
             input_shape = self.input_details[0]['shape']
-            if input_data.shape != tuple(input_shape):
-                # Resize input if necessary
-                input_data = self._preprocess_input(input_data, input_shape)
+            input_tensor = self.interpreter.tensor(self.input_details[0]['index'])()
+            if input_data.shape != tuple(input_shape) or input_data.dtype != self.input_details[0]['dtype']:
+                # Resize and convert input if necessary
+                self._preprocess_input(input_data, input_shape, out=input_tensor)
+            else:
+                np.copyto(input_tensor, input_data)
             
-            # Set input tensor
-            self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
+            # invoke() refuses to run while views of the tensors are alive
+            del input_tensor
             
             # Run inference
             start_time = time.time()
@@ -137,15 +191,124 @@ class NPUController:
             self.logger.error(f"Inference failed: {e}")
             return None
     
-    def _preprocess_input(self, input_data: np.ndarray, target_shape: tuple) -> np.ndarray:
+    def run_inference_batch(self, inputs: List[np.ndarray]) -> List[Optional[np.ndarray]]:
+        """Run one inference over several inputs.
+        
+        The inputs are stacked along the batch dimension and submitted as a
+        single invoke, so the per-call dispatch cost is paid once per batch.
+        Models whose batch size cannot be changed fall back to one inference
+        per input.
+        
+        Args:
+            inputs: Input data as numpy arrays
+            
+        Returns:
+            Inference results in input order, None where inference failed
+        """
+        if not inputs:
+            return []
+        
+        if not self.is_initialized or self.interpreter is None:
+            return [None] * len(inputs)
+        
+        with self._interpreter_lock:
+            return self._run_inference_batch(inputs)
+    
+    def _run_inference_batch(self, inputs: List[np.ndarray]) -> List[Optional[np.ndarray]]:
+        """Run one inference over several inputs with the interpreter lock held.
+        
+        Args:
+            inputs: Input data as numpy arrays
+            
+        Returns:
+            Inference results in input order, None where inference failed
+        """
+        if len(inputs) == 1 or not self._batching_supported:
+            return [self._run_inference(input_data) for input_data in inputs]
+        
+        try:
+            single_shape = tuple(self.input_details[0]['shape'][1:])
+            input_dtype = self.input_details[0]['dtype']
+            batch = self._buffer('batch', (len(inputs), *single_shape), input_dtype)
+            for i, input_data in enumerate(inputs):
+                if input_data.shape[1:] != single_shape or input_data.dtype != input_dtype:
+                    input_data = self._preprocess_input(input_data, (1, *single_shape))
+                batch[i] = input_data[0]
+            self._resize_batch(len(inputs))
+        except Exception as e:
+            self.logger.info(f"Batched inference not supported by model, running per input: {e}")
+            self._batching_supported = False
+            return [self._run_inference(input_data) for input_data in inputs]
+        
+        try:
+            self.interpreter.set_tensor(self.input_details[0]['index'], batch)
+            
+            start_time = time.time()
+            self.interpreter.invoke()
+            inference_time = time.time() - start_time
+            
+            output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
+            
+            self.logger.debug(f"Batched inference of {len(inputs)} inputs completed in {inference_time:.3f}s")
+            return [output_data[i:i + 1] for i in range(len(inputs))]
+            
+        except Exception as e:
+            self.logger.error(f"Batched inference failed: {e}")
+            return [None] * len(inputs)
+    
+    def _resize_batch(self, batch_size: int):
+        """Resize the model input to the given batch size if it differs.
+        
+        Args:
+            batch_size: Number of inputs per invoke
+        """
+        input_shape = self.input_details[0]['shape']
+        if input_shape[0] == batch_size:
+            return
+        
+        self.interpreter.resize_tensor_input(
+            self.input_details[0]['index'], [batch_size, *input_shape[1:]]
+        )
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+    
+    def _buffer(self, name: str, shape: tuple, dtype, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Get a reusable buffer, reallocating it only when its shape or dtype changes.
+        
+        Args:
+            name: Buffer name
+            shape: Required shape
+            dtype: Required dtype
+            out: Array to use instead when it has the required shape and dtype
+            
+        Returns:
+            Buffer with undefined contents
+        """
+        if out is not None and out.shape == shape and out.dtype == dtype:
+            return out
+        
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer
+    
+    def _preprocess_input(self, input_data: np.ndarray, target_shape: tuple,
+                          out: Optional[np.ndarray] = None) -> np.ndarray:
         """Preprocess input data to match model requirements.
         
+        Resizing and dtype conversion write into reusable buffers, so the
+        result is only valid until the next call. With out, the last step
+        writes straight into it instead.
+        
         Args:
             input_data: Original input data
             target_shape: Target shape for the model
+            out: Array to write the result into, e.g. the input tensor
             
         Returns:
-            Preprocessed input data
+            Preprocessed input data, or out when given
         """
         # This is a basic preprocessing example
         # Actual preprocessing would depend on the specific model requirements
@@ -155,18 +318,69 @@ class NPUController:
             
             # Resize if necessary
             if input_data.shape[:2] != (height, width):
-                import cv2
-                input_data = cv2.resize(input_data, (width, height))
+                if cv2 is None:
+                    raise RuntimeError("OpenCV is required to resize NPU inputs")
+                resized = self._buffer(
+                    'resized', (height, width, *input_data.shape[2:]), input_data.dtype,
+                    out=out[0] if out is not None and out.ndim == 4 else None
+                )
+                input_data = cv2.resize(input_data, (width, height), dst=resized)
             
-            # Add batch dimension if necessary
+            # Add batch dimension if necessary (a view, not a copy)
             if len(input_data.shape) == 3:
-                input_data = np.expand_dims(input_data, axis=0)
+                input_data = input_data[np.newaxis]
+        
+        if input_data.dtype == np.uint8:
+            input_data = self._convert_image_dtype(input_data, out)
+        
+        if out is None:
+            return input_data
+        
+        if not np.may_share_memory(input_data, out):
+            np.copyto(out, input_data)
+        return out
+    
+    def _convert_image_dtype(self, image: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Convert a uint8 image to the model's input type.
+        
+        Quantized models take the frame without going through float32 when
+        their input is quantized for [0, 1] (the usual TFLite full-integer
+        export, made with TFLiteConverter and a representative dataset):
+        uint8 inputs with a zero point of 0 are passed as-is, and int8 inputs
+        with a zero point of -128 only need the sign bit flipped. Other
+        quantization parameters are applied through float, and float models
+        get the input normalized to [0, 1].
+        
+        Args:
+            image: Image with uint8 pixels
+            out: Array to write the converted image into when it fits
             
-            # Normalize to [0, 1] if needed
-            if input_data.dtype == np.uint8:
-                input_data = input_data.astype(np.float32) / 255.0
+        Returns:
+            Image in the model's input dtype
+        """
+        input_dtype = self.input_details[0]['dtype']
+        if input_dtype not in (np.uint8, np.int8):
+            converted = self._buffer('converted_float', image.shape, np.float32, out=out)
+            return np.divide(image, 255.0, out=converted, dtype=np.float32)
         
-        return input_data
+        scale, zero_point = self.input_details[0].get('quantization', (0.0, 0))
+        unit_scale = scale == 0 or abs(scale * 255.0 - 1.0) < 1e-6
+        
+        if input_dtype == np.uint8 and unit_scale and zero_point == 0:
+            return image
+        if input_dtype == np.int8 and unit_scale and zero_point == -128:
+            converted = self._buffer(
+                'converted_uint8', image.shape, np.uint8,
+                out=out.view(np.uint8) if out is not None and out.dtype == np.int8 else None
+            )
+            return np.bitwise_xor(image, 0x80, out=converted).view(np.int8)
+        
+        if scale > 0:
+            info = np.iinfo(input_dtype)
+            quantized = np.rint(image / (255.0 * scale)) + zero_point
+            return np.clip(quantized, info.min, info.max).astype(input_dtype)
+        
+        return image if input_dtype == np.uint8 else (image ^ 0x80).view(np.int8)
     
     def detect_objects(self, image: np.ndarray, confidence_threshold: float = 0.5) -> List[Dict[str, Any]]:
         """Detect objects in an image.
@@ -186,6 +400,107 @@ class NPUController:
         if output is None:
             return []
         
+        return self._parse_detections(output, confidence_threshold)
+    
+    def detect_objects_batch(self, images: List[np.ndarray],
+                             confidence_threshold: float = 0.5) -> List[List[Dict[str, Any]]]:
+        """Detect objects in several images with one batched inference.
+        
+        Args:
+            images: Input images as numpy arrays
+            confidence_threshold: Minimum confidence for detections
+            
+        Returns:
+            Detections for each image, in input order
+        """
+        if not self.is_initialized:
+            return [[] for _ in images]
+        
+        return [
+            self._parse_detections(output, confidence_threshold) if output is not None else []
+            for output in self.run_inference_batch(images)
+        ]
+    
+    def submit_detection(self, image: np.ndarray, confidence_threshold: float = 0.5, key: str = 'latest'):
+        """Queue an image for object detection on the worker thread.
+        
+        Returns immediately. If the worker has not yet picked up the previous
+        image, that image is dropped in favour of this one, so results never
+        lag behind by more than one inference.
+        
+        Args:
+            image: Input image, which must not be modified afterwards
+            confidence_threshold: Minimum confidence for detections
+            key: Name the result is stored under, e.g. the camera name
+        """
+        if not self.is_initialized:
+            return
+        
+        if not self._infer_running:
+            self._start_inference_worker()
+        
+        item = (key, image, confidence_threshold)
+        try:
+            self._infer_in.put_nowait(item)
+        except queue.Full:
+            try:
+                self._infer_in.get_nowait()
+            except queue.Empty:
+                pass
+            self._infer_in.put_nowait(item)
+    
+    def get_latest_detections(self, key: str = 'latest') -> Optional[List[Dict[str, Any]]]:
+        """Get the most recent result of submit_detection without blocking.
+        
+        Args:
+            key: Key the image was submitted under
+            
+        Returns:
+            Detections, or None if no result is available yet
+        """
+        return self._infer_out.get(key)
+    
+    def _start_inference_worker(self):
+        """Start the thread running submitted detections."""
+        self._infer_running = True
+        self._infer_thread = threading.Thread(target=self._inference_loop, name="npu-inference", daemon=True)
+        self._infer_thread.start()
+    
+    def _stop_inference_worker(self):
+        """Stop the detection thread and drop any pending image."""
+        self._infer_running = False
+        if self._infer_thread and self._infer_thread.is_alive():
+            self._infer_thread.join(timeout=2.0)
+        self._infer_thread = None
+        
+        try:
+            self._infer_in.get_nowait()
+        except queue.Empty:
+            pass
+    
+    def _inference_loop(self):
+        """Run submitted detections until stopped."""
+        # Started lazily from the control thread; do not inherit its SCHED_FIFO and CPU pin
+        reset_thread_scheduling()
+        while self._infer_running:
+            try:
+                key, image, confidence_threshold = self._infer_in.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            
+            # Item stores are atomic, so readers see either the old or the new result
+            self._infer_out[key] = self._infer_out['latest'] = self.detect_objects(image, confidence_threshold)
+    
+    def _parse_detections(self, output: np.ndarray, confidence_threshold: float) -> List[Dict[str, Any]]:
+        """Parse one image's detection model output.
+        
+        Args:
+            output: Model output for a single image
+            confidence_threshold: Minimum confidence for detections
+            
+        Returns:
+            List of detected objects with bounding boxes and confidence scores
+        """
         # Parse detection results (this is model-specific)
         detections = []
         
@@ -230,21 +545,40 @@ class NPUController:
         
         return info
     
-    def get_status(self) -> Dict[str, Any]:
+    def get_status(self, out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get NPU status.
         
+        Args:
+            out: Dictionary to fill in place instead of allocating a new one
+            
         Returns:
             Status dictionary
         """
-        return {
-            'initialized': self.is_initialized,
-            'npu_type': self.npu_type,
-            'model_loaded': self.interpreter is not None,
-            'model_path': self.model_path
-        }
+        status = {} if out is None else out
+        status['initialized'] = self.is_initialized
+        status['npu_type'] = self.npu_type
+        status['model_loaded'] = self.interpreter is not None
+        status['model_path'] = self.model_path
+        return status
+    
+    def publish_status(self, page: Dict[str, Any], key: str):
+        """Publish a NPU status snapshot into a shared status page.
+        
+        The snapshot is a new dictionary stored with one item assignment,
+        so readers of the page never see a partly written entry.
+        
+        Args:
+            page: Shared status page
+            key: Slot of this controller in the page
+        """
+        page[key] = self.get_status()
     
     def shutdown(self):
         """Shutdown NPU controller."""
+        self._stop_inference_worker()
+        self._infer_out.clear()
+        self._buffers.clear()
+        
         if self.interpreter:
             # Clean up interpreter resources
             self.interpreter = None
@@ -86,11 +86,30 @@ class RobotApplication:
         self.running = True
         self.logger.info("Starting robot main loop...")
         
+        update = self.robot_controller.update
+        period_ns = int(1_000_000_000 / self.robot_controller.cfg.control_frequency)
+        self.robot_controller.enable_realtime_scheduling()
+        
         try:
+            # Sleep to absolute deadlines so the time spent in update() does
+            # not stretch the period
+            next_tick = time.monotonic_ns() + period_ns
             while self.running:
                 # Main control loop
-                self.robot_controller.update()
-                time.sleep(0.01)  # 100Hz control loop
+                update()
+                
+                now = time.monotonic_ns()
+                remaining = next_tick - now
+                if remaining > 0:
+                    time.sleep(remaining / 1e9)
+                else:
+                    if -remaining > period_ns:
+                        self.logger.debug("Main loop overran its period by %.1f ms", -remaining / 1e6)
+                    # Fell behind: restart the schedule from now, but still
+                    # yield so other threads on this core get to run
+                    time.sleep(0)
+                    next_tick = now
+                next_tick += period_ns
                 
         except KeyboardInterrupt:
             self.logger.info("Received interrupt signal, shutting down...")
@@ -0,0 +1,101 @@
+"""
+Batched LiDAR ray casting into a log-odds occupancy grid.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _raycast_batch(grid: np.ndarray, x0: int, y0: int, xs: np.ndarray, ys: np.ndarray,
+                   free_delta: float, occ_delta: float, limit: float):
+    """Apply the log-odds update for every beam of a scan.
+
+    Each ray is walked with integer Bresenham from (x0, y0); traversed cells
+    are lowered by free_delta and the endpoint is raised by occ_delta, with
+    values clamped to [-limit, limit]. The start and all endpoints must lie
+    inside the grid, which keeps every traversed cell in bounds. Rays are
+    walked serially: beams share cells near the origin and at common
+    endpoints, so running them in parallel would race on those updates.
+
+    Args:
+        grid: Log-odds grid indexed [y, x], updated in place
+        x0, y0: Ray origin in map cells
+        xs, ys: Endpoint map cells, one per beam
+        free_delta: Log-odds decrement for cells a beam passes through
+        occ_delta: Log-odds increment for the cell a beam ends in
+        limit: Absolute clamp on log-odds values
+    """
+    for i in range(xs.shape[0]):
+        x1 = xs[i]
+        y1 = ys[i]
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        x = x0
+        y = y0
+
+        # Free space up to, but excluding, the endpoint
+        while x != x1 or y != y1:
+            value = grid[y, x] - free_delta
+            grid[y, x] = value if value > -limit else -limit
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x += sx
+            if e2 <= dx:
+                err += dx
+                y += sy
+
+        value = grid[y1, x1] + occ_delta
+        grid[y1, x1] = value if value < limit else limit
+
+
+def _raycast_batch_numpy(grid: np.ndarray, x0: int, y0: int, xs: np.ndarray, ys: np.ndarray,
+                         free_delta: float, occ_delta: float, limit: float):
+    """Vectorized equivalent of _raycast_batch for when Numba is missing.
+
+    Rays are sampled with a rounded DDA rather than Bresenham, which visits
+    the same cells apart from rounding ties. Updates are scatter-added into
+    a wider accumulator with ufunc.at and clamped once at the end, so cells
+    crossed by many beams cannot overflow the grid dtype.
+
+    Args:
+        grid: Log-odds grid indexed [y, x], updated in place
+        x0, y0: Ray origin in map cells
+        xs, ys: Endpoint map cells, one per beam
+        free_delta: Log-odds decrement for cells a beam passes through
+        occ_delta: Log-odds increment for the cell a beam ends in
+        limit: Absolute clamp on log-odds values
+    """
+    if xs.shape[0] == 0:
+        return
+
+    dx = xs.astype(np.int64) - x0
+    dy = ys.astype(np.int64) - y0
+    steps = np.maximum(np.abs(dx), np.abs(dy))
+
+    # One entry per traversed cell: its ray and position t = 0 .. steps - 1
+    ray = np.repeat(np.arange(steps.shape[0]), steps)
+    t = np.arange(ray.shape[0]) - np.repeat(np.cumsum(steps) - steps, steps)
+    frac = t / steps[ray]
+    free_x = x0 + np.rint(dx[ray] * frac).astype(np.intp)
+    free_y = y0 + np.rint(dy[ray] * frac).astype(np.intp)
+
+    delta = np.zeros(grid.shape, dtype=np.float32 if grid.dtype.kind == 'f' else np.int32)
+    np.subtract.at(delta, (free_y, free_x), free_delta)
+    np.add.at(delta, (ys, xs), occ_delta)
+    delta += grid
+    np.clip(delta, -limit, limit, out=delta)
+    grid[...] = delta
+
+
+if njit is not None:
+    raycast_batch = njit(cache=True)(_raycast_batch)
+else:
+    raycast_batch = _raycast_batch_numpy
@@ -2,12 +2,44 @@
 Navigation System - Path planning, SLAM, and autonomous navigation.
 """
 
+import math
 import numpy as np
 import time
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Deque, Dict, List, Any, Optional, Tuple
 from collections import deque
+from scipy import ndimage
 
 from utils.logger import setup_logger
+from ._raycast import raycast_batch
+
+# Faster dilation for obstacle inflation; SciPy is used without it
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    from skimage.graph import route_through_array
+except ImportError:
+    route_through_array = None
+
+
+# Log-odds occupancy model in int16 fixed point (x100): 0 is unknown, positive is occupied
+LOG_ODDS_OCC = 85      # Increment for a beam endpoint (p = 0.7)
+LOG_ODDS_FREE = 40     # Decrement for cells a beam passes through
+LOG_ODDS_LIMIT = 500   # Clamp so cells can still change state
+INT_OCC = int(100 * np.log(0.7 / 0.3))  # Occupied threshold (p > 0.7)
+
+# Side length of the square map tiles, in cells
+TILE_SIZE = 64
+
+# A* step cost of a diagonal move, and heuristic scale to break ties
+SQRT2 = math.sqrt(2.0)
+HEURISTIC_TIE_BREAK = 1.0 + 1.0 / 10000
+
+# RPLiDAR reports angles in 1/64 degree steps, so a table at that
+# resolution gives exact trig values for every beam
+ANGLE_STEPS_PER_DEGREE = 64
 
 
 class NavigationSystem:
@@ -29,28 +61,42 @@ class NavigationSystem:
         # Navigation state
         self.current_position = np.array([0.0, 0.0, 0.0])  # x, y, theta
         self.target_position = np.array([0.0, 0.0, 0.0])
-        self.path: List[np.ndarray] = []
+        self.path: Deque[np.ndarray] = deque()
         self.is_navigating = False
         self.emergency_stop_active = False
         
-        # SLAM components
-        self.occupancy_map = None
+        # SLAM components, int16 log-odds tiles keyed by (tile_x, tile_y)
+        self.tiles: Dict[Tuple[int, int], np.ndarray] = {}
         self.map_resolution = self.config.get('slam', {}).get('map_resolution', 0.05)
         self.map_size = self.config.get('slam', {}).get('map_size', [2000, 2000])
         
         # Safety parameters
         self.safety_margin = self.config.get('path_planning', {}).get('safety_margin', 0.3)
         self.min_obstacle_distance = 0.5  # meters
+        self._inflated: Optional[np.ndarray] = None  # Inflated obstacles for the current plan
+        
+        # Trig lookup tables indexed by angle in 1/64 degree steps
+        lut_angles = np.radians(np.arange(360 * ANGLE_STEPS_PER_DEGREE) / ANGLE_STEPS_PER_DEGREE)
+        self._cos_lut = np.cos(lut_angles).astype(np.float32)
+        self._sin_lut = np.sin(lut_angles).astype(np.float32)
         
         # Initialize map
         self._initialize_map()
         
     def _initialize_map(self):
         """Initialize the occupancy grid map."""
-        self.occupancy_map = np.ones(self.map_size, dtype=np.float32) * 0.5  # Unknown = 0.5
+        self.tiles.clear()  # Tiles are allocated as scans reach them
         self.map_origin = np.array([-self.map_size[0] * self.map_resolution / 2,
                                    -self.map_size[1] * self.map_resolution / 2])
         
+        # Scan points are relative to the world origin, so rays start there
+        self.scan_origin = self._world_to_map(np.zeros(2))
+        
+        # Compile the ray caster now rather than on the first scan
+        empty = np.empty(0, dtype=np.int32)
+        raycast_batch(np.zeros((TILE_SIZE, TILE_SIZE), dtype=np.int16), 0, 0, empty, empty,
+                      LOG_ODDS_FREE, LOG_ODDS_OCC, LOG_ODDS_LIMIT)
+        
     def update(self) -> Optional[Dict[str, Any]]:
         """Update navigation system and return movement command.
         
@@ -81,76 +127,75 @@ class NavigationSystem:
         
         # Get LiDAR scan data
         scan_data = self.lidar_controller.get_scan_data()
-        if not scan_data:
+        if len(scan_data) == 0:
             return
         
-        # Update occupancy map with scan data
-        for quality, angle, distance in scan_data:
-            # Convert polar to Cartesian coordinates
-            angle_rad = np.radians(angle)
-            x = distance * np.cos(angle_rad)
-            y = distance * np.sin(angle_rad)
-            
-            # Convert to map coordinates
-            map_x = int((x - self.map_origin[0]) / self.map_resolution)
-            map_y = int((y - self.map_origin[1]) / self.map_resolution)
-            
-            # Update map if within bounds
-            if 0 <= map_x < self.map_size[0] and 0 <= map_y < self.map_size[1]:
-                # Mark obstacle
-                self.occupancy_map[map_y, map_x] = 1.0
-                
-                # Mark free space along the ray
-                self._update_ray_casting(0, 0, map_x, map_y)
-    
-    def _update_ray_casting(self, x0: int, y0: int, x1: int, y1: int):
-        """Update free space along a ray using Bresenham's line algorithm.
+        # Convert the whole scan (quality, angle, distance) to map cells at once
+        scan = np.asarray(scan_data, dtype=np.float32)
+        angle_idx = np.rint(scan[:, 1] * ANGLE_STEPS_PER_DEGREE).astype(np.int32) % len(self._cos_lut)
+        distances = scan[:, 2]
+        map_x = np.floor((distances * self._cos_lut[angle_idx] - self.map_origin[0]) / self.map_resolution).astype(np.int32)
+        map_y = np.floor((distances * self._sin_lut[angle_idx] - self.map_origin[1]) / self.map_resolution).astype(np.int32)
         
-        Args:
-            x0, y0: Start coordinates
-            x1, y1: End coordinates
-        """
-        points = self._bresenham_line(x0, y0, x1, y1)
+        # Keep only endpoints within bounds
+        in_bounds = (map_x >= 0) & (map_x < self.map_size[0]) & (map_y >= 0) & (map_y < self.map_size[1])
+        map_x = map_x[in_bounds]
+        map_y = map_y[in_bounds]
+        
+        if len(map_x) == 0:
+            return
         
-        for x, y in points[:-1]:  # Exclude the endpoint (obstacle)
-            if 0 <= x < self.map_size[0] and 0 <= y < self.map_size[1]:
-                # Mark as free space
-                self.occupancy_map[y, x] = 0.0
+        # Only the tiles covering the rays' bounding box are touched
+        origin_x, origin_y = self.scan_origin
+        tx0 = min(origin_x, int(map_x.min())) // TILE_SIZE
+        ty0 = min(origin_y, int(map_y.min())) // TILE_SIZE
+        tx1 = max(origin_x, int(map_x.max())) // TILE_SIZE
+        ty1 = max(origin_y, int(map_y.max())) // TILE_SIZE
+        window = self._gather_tiles(tx0, ty0, tx1, ty1)
+        
+        # Free space along each ray and obstacles at the endpoints
+        x_off = tx0 * TILE_SIZE
+        y_off = ty0 * TILE_SIZE
+        raycast_batch(window, origin_x - x_off, origin_y - y_off, map_x - x_off, map_y - y_off,
+                      LOG_ODDS_FREE, LOG_ODDS_OCC, LOG_ODDS_LIMIT)
+        self._scatter_tiles(window, tx0, ty0)
     
-    def _bresenham_line(self, x0: int, y0: int, x1: int, y1: int) -> List[Tuple[int, int]]:
-        """Bresenham's line algorithm for ray casting.
+    def _gather_tiles(self, tx0: int, ty0: int, tx1: int, ty1: int) -> np.ndarray:
+        """Copy a block of tiles into one contiguous log-odds window.
         
         Args:
-            x0, y0: Start coordinates
-            x1, y1: End coordinates
+            tx0, ty0: First tile indices
+            tx1, ty1: Last tile indices (inclusive)
             
         Returns:
-            List of points along the line
+            int16 window indexed [y, x], zero where no tile exists yet
         """
-        points = []
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        sx = 1 if x0 < x1 else -1
-        sy = 1 if y0 < y1 else -1
-        err = dx - dy
-        
-        x, y = x0, y0
+        window = np.zeros(((ty1 - ty0 + 1) * TILE_SIZE, (tx1 - tx0 + 1) * TILE_SIZE), dtype=np.int16)
+        for ty in range(ty0, ty1 + 1):
+            for tx in range(tx0, tx1 + 1):
+                tile = self.tiles.get((tx, ty))
+                if tile is not None:
+                    y = (ty - ty0) * TILE_SIZE
+                    x = (tx - tx0) * TILE_SIZE
+                    window[y:y + TILE_SIZE, x:x + TILE_SIZE] = tile
+        return window
+    
+    def _scatter_tiles(self, window: np.ndarray, tx0: int, ty0: int):
+        """Write a window back to its tiles, allocating those that changed.
         
-        while True:
-            points.append((x, y))
-            
-            if x == x1 and y == y1:
-                break
-                
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x += sx
-            if e2 < dx:
-                err += dx
-                y += sy
-        
-        return points
+        Args:
+            window: Window produced by _gather_tiles
+            tx0, ty0: Tile indices of the window's top-left tile
+        """
+        for ty in range(window.shape[0] // TILE_SIZE):
+            for tx in range(window.shape[1] // TILE_SIZE):
+                block = window[ty * TILE_SIZE:(ty + 1) * TILE_SIZE, tx * TILE_SIZE:(tx + 1) * TILE_SIZE]
+                key = (tx0 + tx, ty0 + ty)
+                tile = self.tiles.get(key)
+                if tile is not None:
+                    tile[...] = block
+                elif block.any():
+                    self.tiles[key] = block.copy()
     
     def _check_immediate_obstacles(self) -> bool:
         """Check for immediate obstacles in the robot's path.
@@ -164,7 +209,7 @@ class NavigationSystem:
         # Check front sector for obstacles
         obstacles = self.lidar_controller.get_obstacles_in_direction(0, 30)  # Front 60-degree sector
         
-        if obstacles and min(obstacles) < self.min_obstacle_distance:
+        if len(obstacles) and obstacles[0] < self.min_obstacle_distance:
             return True
         
         return False
@@ -186,8 +231,11 @@ class NavigationSystem:
         else:
             self.logger.warning("Failed to plan path to target")
     
-    def _plan_path(self, start: np.ndarray, goal: np.ndarray) -> List[np.ndarray]:
-        """Plan path from start to goal using A* algorithm.
+    def _plan_path(self, start: np.ndarray, goal: np.ndarray) -> Deque[np.ndarray]:
+        """Plan path from start to goal.
+        
+        Uses scikit-image's minimum-cost path search when it is installed
+        and the Python A* implementation otherwise.
         
         Args:
             start: Start position [x, y, theta]
@@ -200,19 +248,84 @@ class NavigationSystem:
         start_map = self._world_to_map(start[:2])
         goal_map = self._world_to_map(goal[:2])
         
-        # Simple A* implementation
-        path_map = self._a_star(start_map, goal_map)
+        # Inflate obstacles once per plan so cell checks are single lookups
+        self._inflated = self._inflated_obstacles()
+        
+        if route_through_array is not None:
+            path_map = self._route_through_grid(start_map, goal_map)
+        else:
+            path_map = self._a_star(start_map, goal_map)
         
         if not path_map:
+            return deque()
+        
+        # Convert back to world coordinates in one pass; waypoints are rows
+        # [x, y, 0] of a single array
+        path_world = np.zeros((len(path_map), 3))
+        path_world[:, :2] = np.asarray(path_map, dtype=np.float64) * self.map_resolution + self.map_origin
+        
+        return deque(path_world)
+    
+    def _route_through_grid(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Minimum-cost 8-connected path over the inflated obstacle grid.
+        
+        Args:
+            start: Start coordinates in map
+            goal: Goal coordinates in map
+            
+        Returns:
+            Path as list of coordinates, empty if none exists
+        """
+        if not (self._is_valid_cell(start) and self._is_valid_cell(goal)):
             return []
         
-        # Convert back to world coordinates
-        path_world = []
-        for point in path_map:
-            world_point = self._map_to_world(point)
-            path_world.append(np.array([world_point[0], world_point[1], 0.0]))
+        # Infinite cost cells are impassable
+        cost = np.where(self._inflated, np.inf, 1.0)
+        try:
+            indices, _ = route_through_array(cost, (start[1], start[0]), (goal[1], goal[0]),
+                                             fully_connected=True)
+        except ValueError:
+            return []  # No path found
+        
+        return [(int(col), int(row)) for row, col in indices]
+    
+    def _inflated_obstacles(self) -> np.ndarray:
+        """Occupied cells grown by the safety margin.
         
-        return path_world
+        Returns:
+            Boolean array indexed [y, x], True where the robot may not go
+        """
+        inflated = np.zeros((self.map_size[1], self.map_size[0]), dtype=bool)
+        if not self.tiles:
+            return inflated
+
+        # Only the block of allocated tiles, padded by the margin, is dilated;
+        # the rest of the map is unknown and stays clear
+        tile_xs, tile_ys = zip(*self.tiles)
+        tx0, ty0 = min(tile_xs), min(tile_ys)
+        window = self._gather_tiles(tx0, ty0, max(tile_xs), max(tile_ys))
+        occupied = (window > INT_OCC).view(np.uint8)
+        safety_cells = int(self.safety_margin / self.map_resolution)
+        if safety_cells > 0:
+            occupied = np.pad(occupied, safety_cells)
+            size = 2 * safety_cells + 1
+            if cv2 is not None:
+                kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size))
+                occupied = cv2.dilate(occupied, kernel)
+            else:
+                y, x = np.ogrid[-safety_cells:safety_cells + 1, -safety_cells:safety_cells + 1]
+                disk = x * x + y * y <= safety_cells * safety_cells
+                occupied = ndimage.grey_dilation(occupied, footprint=disk)
+
+        # Copy the part of the padded window that falls inside the map
+        x0 = tx0 * TILE_SIZE - max(safety_cells, 0)
+        y0 = ty0 * TILE_SIZE - max(safety_cells, 0)
+        x1 = min(x0 + occupied.shape[1], self.map_size[0])
+        y1 = min(y0 + occupied.shape[0], self.map_size[1])
+        cx, cy = max(x0, 0), max(y0, 0)
+        if x1 > cx and y1 > cy:
+            inflated[cy:y1, cx:x1] = occupied[cy - y0:y1 - y0, cx - x0:x1 - x0].view(bool)
+        return inflated
     
     def _a_star(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
         """A* pathfinding algorithm.
@@ -225,15 +338,23 @@ class NavigationSystem:
             Path as list of coordinates
         """
         from heapq import heappush, heappop
+        from itertools import count
         
+        # Entries are (f, insertion order, cell); the counter settles ties
+        # without comparing cells. Cells may be pushed again with a better
+        # score, and the stale entries are skipped once the cell is closed.
+        tie = count()
         open_set = []
-        heappush(open_set, (0, start))
+        heappush(open_set, (0, next(tie), start))
         came_from = {}
         g_score = {start: 0}
         f_score = {start: self._heuristic(start, goal)}
+        closed = set()
         
         while open_set:
-            current = heappop(open_set)[1]
+            current = heappop(open_set)[2]
+            if current in closed:
+                continue
             
             if current == goal:
                 # Reconstruct path
@@ -244,22 +365,29 @@ class NavigationSystem:
                 path.append(start)
                 return path[::-1]
             
+            closed.add(current)
+            
             for neighbor in self._get_neighbors(current):
-                if not self._is_valid_cell(neighbor):
+                if neighbor in closed or not self._is_valid_cell(neighbor):
                     continue
                 
-                tentative_g_score = g_score[current] + 1
+                # Diagonal moves cost sqrt(2), straight moves 1
+                step_cost = 1.0 if neighbor[0] == current[0] or neighbor[1] == current[1] else SQRT2
+                tentative_g_score = g_score[current] + step_cost
                 
                 if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
                     came_from[neighbor] = current
                     g_score[neighbor] = tentative_g_score
                     f_score[neighbor] = tentative_g_score + self._heuristic(neighbor, goal)
-                    heappush(open_set, (f_score[neighbor], neighbor))
+                    heappush(open_set, (f_score[neighbor], next(tie), neighbor))
         
         return []  # No path found
     
     def _heuristic(self, a: Tuple[int, int], b: Tuple[int, int]) -> float:
-        """Heuristic function for A* (Manhattan distance).
+        """Heuristic function for A* (octile distance).
+        
+        Matches the 8-connected step costs, scaled up very slightly so ties
+        between equal-cost paths favour the one closer to the goal.
         
         Args:
             a: First point
@@ -268,7 +396,9 @@ class NavigationSystem:
         Returns:
             Heuristic distance
         """
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+        dx = abs(a[0] - b[0])
+        dy = abs(a[1] - b[1])
+        return ((dx + dy) + (SQRT2 - 2.0) * min(dx, dy)) * HEURISTIC_TIE_BREAK
     
     def _get_neighbors(self, cell: Tuple[int, int]) -> List[Tuple[int, int]]:
         """Get neighboring cells for pathfinding.
@@ -293,6 +423,8 @@ class NavigationSystem:
     def _is_valid_cell(self, cell: Tuple[int, int]) -> bool:
         """Check if a cell is valid for pathfinding.
         
+        Reads the inflated obstacle mask built by _plan_path.
+        
         Args:
             cell: Cell coordinates
             
@@ -301,22 +433,9 @@ class NavigationSystem:
         """
         x, y = cell
         
-        # Check bounds
-        if not (0 <= x < self.map_size[0] and 0 <= y < self.map_size[1]):
-            return False
-        
-        # Check if cell is free (accounting for safety margin)
-        safety_cells = int(self.safety_margin / self.map_resolution)
-        
-        for dx in range(-safety_cells, safety_cells + 1):
-            for dy in range(-safety_cells, safety_cells + 1):
-                check_x, check_y = x + dx, y + dy
-                if (0 <= check_x < self.map_size[0] and 
-                    0 <= check_y < self.map_size[1] and
-                    self.occupancy_map[check_y, check_x] > 0.7):  # Occupied threshold
-                    return False
-        
-        return True
+        # In bounds and clear of the safety margin around obstacles
+        return (0 <= x < self.map_size[0] and 0 <= y < self.map_size[1] and
+                not self._inflated[y, x])
     
     def _world_to_map(self, world_pos: np.ndarray) -> Tuple[int, int]:
         """Convert world coordinates to map coordinates.
@@ -354,37 +473,32 @@ class NavigationSystem:
             self.is_navigating = False
             return {'velocities': {'base_rotation': 0, 'shoulder': 0, 'elbow': 0, 'wrist': 0}}
         
-        # Get next waypoint
-        next_waypoint = self.path[0]
+        # Get next waypoint; 2-vectors are cheaper as plain floats than ndarrays
+        cx, cy, ctheta = self.current_position.tolist()
+        nx, ny = self.path[0][:2].tolist()
+        dx = nx - cx
+        dy = ny - cy
         
         # Calculate distance to waypoint
-        distance = np.linalg.norm(next_waypoint[:2] - self.current_position[:2])
+        distance = math.hypot(dx, dy)
         
         # If close enough to waypoint, move to next one
         if distance < 0.1:  # 10cm threshold
-            self.path.pop(0)
+            self.path.popleft()
             if not self.path:
                 self.is_navigating = False
                 self.logger.info("Target reached")
                 return {'velocities': {'base_rotation': 0, 'shoulder': 0, 'elbow': 0, 'wrist': 0}}
         
         # Calculate movement command
-        angle_to_target = np.arctan2(
-            next_waypoint[1] - self.current_position[1],
-            next_waypoint[0] - self.current_position[0]
-        )
+        angle_to_target = math.atan2(dy, dx)
         
-        angle_diff = angle_to_target - self.current_position[2]
-        
-        # Normalize angle difference
-        while angle_diff > np.pi:
-            angle_diff -= 2 * np.pi
-        while angle_diff < -np.pi:
-            angle_diff += 2 * np.pi
+        # Normalize angle difference to [-pi, pi]
+        angle_diff = math.remainder(angle_to_target - ctheta, 2 * math.pi)
         
         # Simple proportional control
-        angular_velocity = np.clip(angle_diff * 2.0, -1.0, 1.0)
-        linear_velocity = np.clip(distance * 0.5, 0.0, 0.5) if abs(angle_diff) < 0.5 else 0.0
+        angular_velocity = min(max(angle_diff * 2.0, -1.0), 1.0)
+        linear_velocity = min(distance * 0.5, 0.5) if abs(angle_diff) < 0.5 else 0.0
         
         # Convert to motor commands (simplified)
         return {
@@ -412,9 +526,22 @@ class NavigationSystem:
         """Get current occupancy map.
         
         Returns:
-            Occupancy map as numpy array
+            Occupancy probabilities as numpy array (unknown = 0.5)
+        """
+        log_odds = self._log_odds_map().astype(np.float32) / 100.0
+        return 1.0 - 1.0 / (1.0 + np.exp(log_odds))
+    
+    def _log_odds_map(self) -> np.ndarray:
+        """Stitch the tiles into one dense log-odds grid.
+        
+        Returns:
+            int16 fixed-point log-odds indexed [y, x]
         """
-        return self.occupancy_map.copy()
+        log_odds = np.zeros((self.map_size[1], self.map_size[0]), dtype=np.int16)
+        for (tx, ty), tile in self.tiles.items():
+            block = log_odds[ty * TILE_SIZE:(ty + 1) * TILE_SIZE, tx * TILE_SIZE:(tx + 1) * TILE_SIZE]
+            block[...] = tile[:block.shape[0], :block.shape[1]]
+        return log_odds
     
     def shutdown(self):
         """Shutdown navigation system."""
@@ -2,6 +2,7 @@
 Utility functions and helpers for the RTK-VL Robot.
 """
 
-from .logger import setup_logger
+from .logger import setup_logger, DeferredLog
+from .scheduling import reset_thread_scheduling
 
-__all__ = ['setup_logger'] 
\ No newline at end of file
+__all__ = ['setup_logger', 'DeferredLog', 'reset_thread_scheduling']
\ No newline at end of file
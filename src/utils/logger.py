@@ -4,22 +4,96 @@ Logging utilities for the RTK-VL Robot system.
 
 import logging
 import sys
+import threading
+import time
+from collections import deque
 from pathlib import Path
 from typing import Optional
 from loguru import logger
 
 
-def setup_logger(name: str, level: str = "INFO", log_file: Optional[str] = None) -> logging.Logger:
+_LOGGING_FILE = logging.__file__
+
+# Frames between InterceptHandler.emit and the code that called
+# Logger.debug/info/...: Handler.handle, Logger.callHandlers,
+# Logger.handle, Logger._log and the level method itself
+_CALLER_DEPTH = 6
+
+
+class InterceptHandler(logging.Handler):
+    """Forward standard logging records to loguru."""
+    
+    def emit(self, record):
+        # Get corresponding Loguru level if it exists
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+
+        caller = getattr(record, 'caller', None)
+        if caller is not None:
+            # Deferred records are emitted from the drain thread; report
+            # the code and time that queued them instead
+            module, function, line = caller
+            created = record.created
+            
+            def patch(r):
+                r.update(name=module, module=module.rpartition('.')[2], function=function, line=line,
+                         time=type(r['time']).fromtimestamp(created, r['time'].tzinfo))
+            
+            logger.patch(patch).opt(exception=record.exc_info, lazy=True).log(level, "{}", record.getMessage)
+            return
+
+        # Jump straight to the usual caller frame, walking further out only
+        # for records that went through extra logging frames (e.g. logging.info)
+        depth = _CALLER_DEPTH
+        frame = sys._getframe(depth)
+        while frame.f_code.co_filename == _LOGGING_FILE:
+            frame = frame.f_back
+            depth += 1
+
+        # Lazy so the message is only built if a sink accepts the level
+        logger.opt(depth=depth, exception=record.exc_info, lazy=True).log(level, "{}", record.getMessage)
+
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def setup_logger(name: str, level: str = "INFO", log_file: Optional[str] = None,
+                 force: bool = False) -> logging.Logger:
     """Setup logger with consistent formatting.
     
+    Sinks are installed by the first call only; later calls just return
+    the named logger, so constructing components does not reinstall them.
+    
     Args:
         name: Logger name
         level: Logging level
         log_file: Optional log file path
+        force: Reinstall the sinks with these settings even if already set up
         
     Returns:
         Configured logger instance
     """
+    global _configured
+    
+    if force or not _configured:
+        with _configure_lock:
+            if force or not _configured:
+                _configure_sinks(level, log_file)
+                _configured = True
+    
+    return logging.getLogger(name)
+
+
+def _configure_sinks(level: str, log_file: Optional[str]):
+    """Install the loguru sinks and route standard logging through them.
+    
+    Args:
+        level: Logging level
+        log_file: Optional log file path
+    """
     # Remove default loguru handler
     logger.remove()
     
@@ -45,24 +119,93 @@ def setup_logger(name: str, level: str = "INFO", log_file: Optional[str] = None)
             compression="zip"
         )
     
-    # Create standard logger that forwards to loguru
-    class InterceptHandler(logging.Handler):
-        def emit(self, record):
-            # Get corresponding Loguru level if it exists
-            try:
-                level = logger.level(record.levelname).name
-            except ValueError:
-                level = record.levelno
+    # Setup standard logging to use loguru; the level lets isEnabledFor drop
+    # records before they are created or formatted
+    logging.basicConfig(handlers=[InterceptHandler()], level=level, force=True)
 
-            # Find caller from where originated the logged message
-            frame, depth = logging.currentframe(), 2
-            while frame.f_code.co_filename == logging.__file__:
-                frame = frame.f_back
-                depth += 1
 
-            logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
-
-    # Setup standard logging to use loguru
-    logging.basicConfig(handlers=[InterceptHandler()], level=0, force=True)
+class DeferredLog:
+    """Log from real-time code without formatting or locking on the caller.
+    
+    Records are appended to a bounded deque, which CPython appends to
+    atomically without a lock, and a background thread drains the whole
+    queue each wakeup, doing the formatting and handler I/O there. Each
+    record keeps the caller's module, function, line and queue time, so
+    it is logged as if emitted where and when it was queued. When the
+    queue is full the oldest records are dropped rather than blocking.
+    
+    Attributes:
+        logger: Logger the queued records are emitted to
+    """
+    
+    def __init__(self, target: logging.Logger, capacity: int = 4096, interval: float = 0.05):
+        """Initialize deferred log and start its drain thread.
+        
+        Args:
+            target: Logger to emit records to
+            capacity: Maximum number of queued records
+            interval: Seconds between drains
+        """
+        self.logger = target
+        self.interval = interval
+        self._records = deque(maxlen=capacity)
+        self._running = True
+        self._thread = threading.Thread(target=self._drain_loop, name="deferred-log", daemon=True)
+        self._thread.start()
+    
+    def log(self, level: int, msg: str, *args):
+        """Queue a record; msg is %-formatted with args when drained."""
+        self._append(level, msg, args, sys._getframe(1))
+    
+    def debug(self, msg: str, *args):
+        """Queue a DEBUG record."""
+        self._append(logging.DEBUG, msg, args, sys._getframe(1))
+    
+    def info(self, msg: str, *args):
+        """Queue an INFO record."""
+        self._append(logging.INFO, msg, args, sys._getframe(1))
+    
+    def warning(self, msg: str, *args):
+        """Queue a WARNING record."""
+        self._append(logging.WARNING, msg, args, sys._getframe(1))
+    
+    def error(self, msg: str, *args):
+        """Queue an ERROR record."""
+        self._append(logging.ERROR, msg, args, sys._getframe(1))
+    
+    def _append(self, level: int, msg: str, args: tuple, frame):
+        """Queue a record with the calling frame's location and the current time."""
+        code = frame.f_code
+        self._records.append((level, msg, args, time.time(), frame.f_globals.get('__name__', ''),
+                              code.co_filename, code.co_name, frame.f_lineno))
+    
+    def flush(self):
+        """Emit every queued record now."""
+        target = self.logger
+        records = self._records
+        while records:
+            try:
+                level, msg, args, created, module, path, function, line = records.popleft()
+            except IndexError:
+                break
+            if not target.isEnabledFor(level):
+                continue
+            
+            record = target.makeRecord(target.name, level, path, line, msg, args, None, function)
+            record.created = created
+            record.msecs = (created - int(created)) * 1000
+            record.caller = (module, function, line)
+            target.handle(record)
+    
+    def close(self):
+        """Stop the drain thread after emitting what is still queued."""
+        self._running = False
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        self.flush()
     
-    return logging.getLogger(name) 
\ No newline at end of file
+    def _drain_loop(self):
+        """Drain the queue periodically until closed."""
+        while self._running:
+            time.sleep(self.interval)
+            self.flush()
@@ -0,0 +1,27 @@
+"""
+Thread scheduling helpers for the RTK-VL Robot.
+"""
+
+import os
+
+
+def reset_thread_scheduling():
+    """
+    Return the calling thread to SCHED_OTHER on all CPUs.
+    
+    Threads inherit the policy and CPU mask of the thread that creates
+    them, so workers started lazily from the SCHED_FIFO control thread
+    would otherwise compete with it on its pinned cores. Call this at
+    the start of such workers.
+    """
+    if hasattr(os, 'sched_setscheduler'):
+        try:
+            os.sched_setscheduler(0, os.SCHED_OTHER, os.sched_param(0))
+        except (OSError, ValueError):
+            pass
+    
+    if hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, range(os.cpu_count() or 1))
+        except (OSError, ValueError):
+            pass
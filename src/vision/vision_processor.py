@@ -3,6 +3,7 @@ Vision Processor - Computer vision processing and analysis.
 """
 
 import cv2
+import time
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
 
@@ -29,9 +30,71 @@ class VisionProcessor:
         self.confidence_threshold = self.config.get('object_detection', {}).get('confidence_threshold', 0.5)
         self.nms_threshold = self.config.get('object_detection', {}).get('nms_threshold', 0.4)
         
+        # NPU batching: frames are queued until batch_size is reached or the
+        # oldest has waited max_batch_delay_ms, then detected in one call
+        self.batch_size = self.config.get('object_detection', {}).get('batch_size', 1)
+        self.max_batch_delay = self.config.get('object_detection', {}).get('max_batch_delay_ms', 50) / 1000.0
+        
         # Processing state
         self.latest_detections: List[Dict[str, Any]] = []
         self.latest_frame: Optional[np.ndarray] = None
+        self.detections_by_camera: Dict[str, List[Dict[str, Any]]] = {}
+        
+        self._frame_batch: List[Tuple[str, np.ndarray]] = []
+        self._batch_started = 0.0
+        
+        # Latest frames are copied into a ring of preallocated buffers and
+        # published as read-only views. A slot is rewritten ring_size frames
+        # later, which covers a full NPU batch, or the frame queued for and
+        # the frame running on the NPU worker, plus the frame being read.
+        self._frame_ring: List[np.ndarray] = []
+        self._ring_size = max(4, self.batch_size + 2)
+        self._ring_idx = 0
+        
+        # Face detectors are loaded once; YuNet is preferred when a model is configured
+        self._face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        self._face_detector = self._load_face_detector(self.config.get('face_recognition', {}).get('detector_model'))
+        self._face_detector_size: Optional[Tuple[int, int]] = None
+        self._gray_buf: Optional[np.ndarray] = None
+        
+        # Red wraps around hue 0; rotating hue by 90 maps both red ranges
+        # (0-10 and 170-179) onto 80-100 so a single inRange covers them
+        identity = np.arange(256, dtype=np.uint8)
+        rotated_hue = ((identity.astype(np.int32) + 90) % 180).astype(np.uint8)
+        self._red_hue_lut = np.dstack([rotated_hue, identity, identity])
+        self._red_lower = np.array([80, 50, 50])
+        self._red_upper = np.array([100, 255, 255])
+        
+        # Color detection runs through OpenCL (T-API) when a device is available,
+        # otherwise into buffers reused across frames
+        self._use_opencl = cv2.ocl.haveOpenCL()
+        self._hsv_buf: Optional[np.ndarray] = None
+        self._mask_buf: Optional[np.ndarray] = None
+        self._labels_buf: Optional[np.ndarray] = None
+        self._draw_buf: Optional[np.ndarray] = None
+        
+    def _load_face_detector(self, model_path: Optional[str]):
+        """Create the YuNet face detector if a model is available.
+        
+        Args:
+            model_path: Path to the YuNet ONNX model, or None
+            
+        Returns:
+            cv2.FaceDetectorYN instance, or None to use the Haar cascade
+        """
+        if not model_path:
+            return None
+        
+        if not hasattr(cv2, 'FaceDetectorYN_create'):
+            self.logger.warning("OpenCV build has no FaceDetectorYN, using Haar cascade for faces")
+            return None
+        
+        try:
+            # Input size is set per frame in detect_faces
+            return cv2.FaceDetectorYN_create(model_path, "", (320, 320))
+        except cv2.error as e:
+            self.logger.warning(f"Failed to load face detector model {model_path}: {e}")
+            return None
         
     def process_frame(self, camera_name: str = 'front_camera') -> bool:
         """Process the latest frame from specified camera.
@@ -50,14 +113,80 @@ class VisionProcessor:
         if frame is None:
             return False
         
-        self.latest_frame = frame.copy()
+        self.latest_frame = self._store_frame(frame)
         
         # Perform object detection if enabled
         if self.config.get('object_detection', {}).get('enabled', False):
-            self.latest_detections = self.detect_objects(frame)
+            if self.npu_controller and self.npu_controller.is_initialized:
+                if self.batch_size > 1:
+                    self._queue_frame(camera_name, self.latest_frame)
+                else:
+                    # Inference runs on the NPU worker; take whatever result
+                    # it has finished so far instead of waiting for this one
+                    self.npu_controller.submit_detection(self.latest_frame, self.confidence_threshold, camera_name)
+                    detections = self.npu_controller.get_latest_detections(camera_name)
+                    if detections is not None:
+                        self.latest_detections = detections
+                        self.detections_by_camera[camera_name] = detections
+            else:
+                self.latest_detections = self.detect_objects(frame)
+                self.detections_by_camera[camera_name] = self.latest_detections
         
         return True
     
+    def _store_frame(self, frame: np.ndarray) -> np.ndarray:
+        """Copy a camera frame into the next ring buffer.
+        
+        Args:
+            frame: Frame from the camera controller
+            
+        Returns:
+            Read-only view of the stored copy
+        """
+        ring = self._frame_ring
+        if not ring or ring[0].shape != frame.shape or ring[0].dtype != frame.dtype:
+            # Views handed out earlier keep the old buffers alive
+            ring = self._frame_ring = [np.empty_like(frame) for _ in range(self._ring_size)]
+        
+        self._ring_idx = (self._ring_idx + 1) % len(ring)
+        buffer = ring[self._ring_idx]
+        np.copyto(buffer, frame)
+        
+        stored = buffer.view()
+        stored.flags.writeable = False
+        return stored
+    
+    def _queue_frame(self, camera_name: str, frame: np.ndarray):
+        """Add a frame to the NPU batch, dispatching it once due.
+        
+        Args:
+            camera_name: Camera the frame came from
+            frame: Frame owned by the batch
+        """
+        now = time.monotonic()
+        if not self._frame_batch:
+            self._batch_started = now
+        self._frame_batch.append((camera_name, frame))
+        
+        if len(self._frame_batch) >= self.batch_size or now - self._batch_started >= self.max_batch_delay:
+            self._flush_batch()
+    
+    def _flush_batch(self):
+        """Run detection on all queued frames and scatter the results per camera."""
+        if not self._frame_batch:
+            return
+        
+        camera_names = [camera_name for camera_name, _ in self._frame_batch]
+        frames = [frame for _, frame in self._frame_batch]
+        self._frame_batch = []
+        
+        results = self.npu_controller.detect_objects_batch(frames, self.confidence_threshold)
+        for camera_name, detections in zip(camera_names, results):
+            self.detections_by_camera[camera_name] = detections
+        
+        if results:
+            self.latest_detections = results[-1]
+    
     def detect_objects(self, frame: np.ndarray) -> List[Dict[str, Any]]:
         """Detect objects in the given frame.
         
@@ -90,32 +219,37 @@ class VisionProcessor:
         detections = []
         
         # Simple color-based detection example (detect red objects)
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        
-        # Define range for red color
-        lower_red1 = np.array([0, 50, 50])
-        upper_red1 = np.array([10, 255, 255])
-        lower_red2 = np.array([170, 50, 50])
-        upper_red2 = np.array([180, 255, 255])
-        
-        # Create masks
-        mask1 = cv2.inRange(hsv, lower_red1, upper_red1)
-        mask2 = cv2.inRange(hsv, lower_red2, upper_red2)
-        mask = mask1 + mask2
-        
-        # Find contours
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > 500:  # Minimum area threshold
-                x, y, w, h = cv2.boundingRect(contour)
-                detections.append({
-                    'bbox': [x, y, x + w, y + h],
-                    'confidence': 0.8,  # Fixed confidence for color detection
-                    'class_id': 0,  # Generic object class
-                    'class_name': 'red_object'
-                })
+        if self._use_opencl:
+            hsv = cv2.cvtColor(cv2.UMat(frame), cv2.COLOR_BGR2HSV)
+            hsv = cv2.LUT(hsv, self._red_hue_lut)
+            mask = cv2.inRange(hsv, self._red_lower, self._red_upper).get()
+        else:
+            if self._hsv_buf is None or self._hsv_buf.shape != frame.shape:
+                self._hsv_buf = np.empty_like(frame)
+                self._mask_buf = np.empty(frame.shape[:2], dtype=np.uint8)
+            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV, dst=self._hsv_buf)
+            cv2.LUT(hsv, self._red_hue_lut, dst=hsv)
+            mask = cv2.inRange(hsv, self._red_lower, self._red_upper, dst=self._mask_buf)
+        
+        # Size and bounds of every blob in one pass; row 0 is the background
+        if self._labels_buf is None or self._labels_buf.shape != mask.shape:
+            self._labels_buf = np.empty(mask.shape, dtype=np.int32)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask, labels=self._labels_buf, connectivity=8,
+                                                          ltype=cv2.CV_32S)
+        blobs = stats[1:]
+        blobs = blobs[blobs[:, cv2.CC_STAT_AREA] > 500]  # Minimum area threshold
+        
+        x1 = blobs[:, cv2.CC_STAT_LEFT]
+        y1 = blobs[:, cv2.CC_STAT_TOP]
+        x2 = x1 + blobs[:, cv2.CC_STAT_WIDTH]
+        y2 = y1 + blobs[:, cv2.CC_STAT_HEIGHT]
+        for bbox in np.stack([x1, y1, x2, y2], axis=1).tolist():
+            detections.append({
+                'bbox': bbox,
+                'confidence': 0.8,  # Fixed confidence for color detection
+                'class_id': 0,  # Generic object class
+                'class_name': 'red_object'
+            })
         
         return detections
     
@@ -130,14 +264,31 @@ class VisionProcessor:
         """
         faces = []
         
-        # Convert to grayscale
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Load Haar cascade for face detection
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        if self._face_detector is not None:
+            height, width = frame.shape[:2]
+            if self._face_detector_size != (width, height):
+                self._face_detector.setInputSize((width, height))
+                self._face_detector_size = (width, height)
+            
+            # Rows are x, y, w, h, five landmarks, then the score
+            _, detected_faces = self._face_detector.detect(frame)
+            if detected_faces is not None:
+                for row in detected_faces:
+                    x, y, w, h = (int(v) for v in row[:4])
+                    faces.append({
+                        'bbox': [x, y, x + w, y + h],
+                        'confidence': float(row[14]),
+                        'type': 'face'
+                    })
+            return faces
+        
+        # Convert to grayscale into a buffer reused across frames
+        if self._gray_buf is None or self._gray_buf.shape != frame.shape[:2]:
+            self._gray_buf = np.empty(frame.shape[:2], dtype=np.uint8)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray_buf)
         
         # Detect faces
-        detected_faces = face_cascade.detectMultiScale(gray, 1.1, 4)
+        detected_faces = self._face_cascade.detectMultiScale(gray, 1.1, 4)
         
         for (x, y, w, h) in detected_faces:
             faces.append({
@@ -163,58 +314,58 @@ class VisionProcessor:
         
         current_detections = self.detect_objects(frame)
         
-        for current_det in current_detections:
-            best_match = None
-            best_overlap = 0
-            
-            for prev_det in previous_detections:
-                overlap = self._calculate_bbox_overlap(current_det['bbox'], prev_det['bbox'])
-                if overlap > best_overlap and overlap > 0.3:  # Minimum overlap threshold
-                    best_overlap = overlap
-                    best_match = prev_det
-            
-            if best_match:
-                current_det['track_id'] = best_match.get('track_id', 0)
+        if not current_detections:
+            return current_detections
+        
+        if previous_detections:
+            overlaps = self._bbox_iou_matrix(
+                np.asarray([det['bbox'] for det in current_detections], dtype=np.float32).reshape(-1, 4),
+                np.asarray([det['bbox'] for det in previous_detections], dtype=np.float32).reshape(-1, 4))
+            best_matches = overlaps.argmax(axis=1)
+            matched = overlaps[np.arange(len(current_detections)), best_matches] > 0.3  # Minimum overlap threshold
+        else:
+            best_matches = np.zeros(len(current_detections), dtype=np.intp)
+            matched = np.zeros(len(current_detections), dtype=bool)
+        
+        for current_det, best_match, is_matched in zip(current_detections, best_matches, matched):
+            if is_matched:
+                current_det['track_id'] = previous_detections[best_match].get('track_id', 0)
             else:
                 # Assign new track ID
                 current_det['track_id'] = len(previous_detections) + len(current_detections)
         
         return current_detections
     
-    def _calculate_bbox_overlap(self, bbox1: List[float], bbox2: List[float]) -> float:
-        """Calculate overlap between two bounding boxes.
+    def _bbox_iou_matrix(self, boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+        """Calculate overlap between every pair of bounding boxes.
         
         Args:
-            bbox1: First bounding box [x1, y1, x2, y2]
-            bbox2: Second bounding box [x1, y1, x2, y2]
+            boxes1: (N, 4) array of [x1, y1, x2, y2] boxes
+            boxes2: (M, 4) array of [x1, y1, x2, y2] boxes
             
         Returns:
-            Overlap ratio (0-1)
+            (N, M) overlap ratios (0-1)
         """
-        x1_1, y1_1, x2_1, y2_1 = bbox1
-        x1_2, y1_2, x2_2, y2_2 = bbox2
-        
         # Calculate intersection
-        x1_i = max(x1_1, x1_2)
-        y1_i = max(y1_1, y1_2)
-        x2_i = min(x2_1, x2_2)
-        y2_i = min(y2_1, y2_2)
-        
-        if x2_i <= x1_i or y2_i <= y1_i:
-            return 0.0
-        
-        intersection = (x2_i - x1_i) * (y2_i - y1_i)
+        x1 = np.maximum(boxes1[:, None, 0], boxes2[None, :, 0])
+        y1 = np.maximum(boxes1[:, None, 1], boxes2[None, :, 1])
+        x2 = np.minimum(boxes1[:, None, 2], boxes2[None, :, 2])
+        y2 = np.minimum(boxes1[:, None, 3], boxes2[None, :, 3])
+        intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
         
         # Calculate union
-        area1 = (x2_1 - x1_1) * (y2_1 - y1_1)
-        area2 = (x2_2 - x1_2) * (y2_2 - y1_2)
-        union = area1 + area2 - intersection
+        area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
+        area2 = (boxes2[:, 2] - boxes2[:, 0]) * (boxes2[:, 3] - boxes2[:, 1])
+        union = area1[:, None] + area2[None, :] - intersection
         
-        return intersection / union if union > 0 else 0.0
+        return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
     
     def draw_detections(self, frame: np.ndarray, detections: List[Dict[str, Any]]) -> np.ndarray:
         """Draw detection results on frame.
         
+        Drawing happens in a buffer reused across calls, so the returned
+        frame is only valid until the next call.
+        
         Args:
             frame: Input frame
             detections: List of detections to draw
@@ -222,25 +373,40 @@ class VisionProcessor:
         Returns:
             Frame with drawn detections
         """
-        result_frame = frame.copy()
+        if self._draw_buf is None or self._draw_buf.shape != frame.shape or self._draw_buf.dtype != frame.dtype:
+            self._draw_buf = np.empty_like(frame)
+        np.copyto(self._draw_buf, frame)
+        result_frame = self._draw_buf
+        
+        if not detections:
+            return result_frame
         
-        for detection in detections:
+        labels = []
+        box_corners = np.empty((len(detections), 4, 2), dtype=np.int32)
+        label_corners = np.empty((len(detections), 4, 2), dtype=np.int32)
+        
+        for i, detection in enumerate(detections):
             bbox = detection['bbox']
             confidence = detection['confidence']
             class_name = detection.get('class_name', f"Class {detection.get('class_id', 'Unknown')}")
             
             x1, y1, x2, y2 = map(int, bbox)
+            box_corners[i] = ((x1, y1), (x2, y1), (x2, y2), (x1, y2))
             
-            # Draw bounding box
-            cv2.rectangle(result_frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            
-            # Draw label
             label = f"{class_name}: {confidence:.2f}"
             label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)[0]
-            cv2.rectangle(result_frame, (x1, y1 - label_size[1] - 10), 
-                         (x1 + label_size[0], y1), (0, 255, 0), -1)
-            cv2.putText(result_frame, label, (x1, y1 - 5), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 2)
+            label_top = y1 - label_size[1] - 10
+            label_corners[i] = ((x1, label_top), (x1 + label_size[0], label_top),
+                                (x1 + label_size[0], y1), (x1, y1))
+            labels.append((label, (x1, y1 - 5)))
+        
+        # Draw all bounding boxes and label backgrounds in one call each
+        cv2.polylines(result_frame, box_corners, True, (0, 255, 0), 2)
+        cv2.fillPoly(result_frame, label_corners, (0, 255, 0))
+        
+        # Draw labels
+        for label, origin in labels:
+            cv2.putText(result_frame, label, origin, cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 2)
         
         return result_frame
     
@@ -255,13 +421,19 @@ class VisionProcessor:
     def get_latest_frame(self) -> Optional[np.ndarray]:
         """Get the latest processed frame.
         
+        The frame is a read-only view of a ring buffer, not a copy, and is
+        overwritten a few frames later, so callers that keep it must copy it.
+        
         Returns:
             Latest frame or None
         """
-        return self.latest_frame.copy() if self.latest_frame is not None else None
+        return self.latest_frame
     
     def shutdown(self):
         """Shutdown vision processor."""
+        self._frame_batch = []
+        self.detections_by_camera.clear()
         self.latest_detections.clear()
         self.latest_frame = None
+        self._frame_ring = []
         self.logger.info("Vision processor shutdown complete") 
\ No newline at end of file
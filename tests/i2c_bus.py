@@ -0,0 +1,44 @@
+"""
+Shared I2C Bus Handles
+
+One SMBus per bus number for every sensor driver in the process, so
+drivers share a single /dev/i2c-* file descriptor instead of each opening
+their own. Handles are closed at interpreter exit.
+"""
+import atexit
+import threading
+
+from smbus2 import SMBus
+
+_buses = {}
+_lock = threading.Lock()
+
+
+def get_bus(bus_num=1):
+    """
+    Get the shared SMBus handle for a bus, opening it on first use.
+    
+    Args:
+        bus_num: I2C bus number (default: 1)
+    
+    Returns:
+        SMBus: Handle shared by all callers for this bus
+    """
+    with _lock:
+        bus = _buses.get(bus_num)
+        if bus is None:
+            bus = SMBus(bus_num)
+            _buses[bus_num] = bus
+        return bus
+
+
+@atexit.register
+def _close_buses():
+    """Close every shared bus handle."""
+    with _lock:
+        for bus in _buses.values():
+            try:
+                bus.close()
+            except Exception:
+                pass
+        _buses.clear()
@@ -0,0 +1,141 @@
+"""
+IMU Sensor Fusion
+
+Madgwick gradient-descent orientation filter for MPU9250 accelerometer
+and gyroscope samples, compiled with Numba when it is installed.
+"""
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, float32
+except ImportError:
+    njit = None
+
+# Literals as float32 so the filter arithmetic is never promoted to float64
+_HALF = np.float32(0.5)
+_ONE = np.float32(1.0)
+_TWO = np.float32(2.0)
+_FOUR = np.float32(4.0)
+_EIGHT = np.float32(8.0)
+
+
+def _madgwick_update(q, gx, gy, gz, ax, ay, az, beta, dt):
+    """
+    One Madgwick IMU update step (accelerometer and gyroscope only).
+    
+    The gyroscope rate of change of orientation, 0.5 * q ⊗ [0, gx, gy, gz],
+    is corrected by a normalized gradient-descent step J^T F towards the
+    orientation whose predicted gravity matches the measured acceleration.
+    The gradient uses the refactored form with the 2q, 4q, 8q and q*q
+    terms computed once, which needs far fewer multiplications than
+    building F and J separately.
+    
+    Args:
+        q: Current orientation quaternion [w, x, y, z], float32 array of length 4
+        gx, gy, gz: Angular rate in rad/s
+        ax, ay, az: Acceleration in any unit; only its direction is used
+        beta: Filter gain
+        dt: Time since the previous update in seconds
+    
+    All scalars are float32 in the compiled kernel, as in the usual C ports
+    of the filter; float64 arguments are narrowed on the call.
+    
+    Returns:
+        numpy.ndarray: Updated unit quaternion, float32 array of length 4
+    """
+    q0, q1, q2, q3 = q[0], q[1], q[2], q[3]
+    
+    # Rate of change of quaternion from gyroscope
+    qdot0 = _HALF * (-q1 * gx - q2 * gy - q3 * gz)
+    qdot1 = _HALF * (q0 * gx + q2 * gz - q3 * gy)
+    qdot2 = _HALF * (q0 * gy - q1 * gz + q3 * gx)
+    qdot3 = _HALF * (q0 * gz + q1 * gy - q2 * gx)
+    
+    # Skip the correction when the accelerometer reads zero (free fall or bad sample)
+    if not (ax == 0.0 and ay == 0.0 and az == 0.0):
+        # Normalize with one reciprocal square root and multiplies
+        inv = _ONE / np.sqrt(ax * ax + ay * ay + az * az)
+        ax *= inv
+        ay *= inv
+        az *= inv
+        
+        # Products reused by the gradient, hoisted once per step
+        _2q0 = _TWO * q0
+        _2q1 = _TWO * q1
+        _2q2 = _TWO * q2
+        _2q3 = _TWO * q3
+        _4q0 = _FOUR * q0
+        _4q1 = _FOUR * q1
+        _4q2 = _FOUR * q2
+        _8q1 = _EIGHT * q1
+        _8q2 = _EIGHT * q2
+        q0q0 = q0 * q0
+        q1q1 = q1 * q1
+        q2q2 = q2 * q2
+        q3q3 = q3 * q3
+        
+        # Gradient J^T F of the gravity objective, expanded for a unit quaternion
+        s0 = _4q0 * q2q2 + _2q2 * ax + _4q0 * q1q1 - _2q1 * ay
+        s1 = (_4q1 * q3q3 - _2q3 * ax + _FOUR * q0q0 * q1 - _2q0 * ay - _4q1
+              + _8q1 * q1q1 + _8q1 * q2q2 + _4q1 * az)
+        s2 = (_FOUR * q0q0 * q2 + _2q0 * ax + _4q2 * q3q3 - _2q3 * ay - _4q2
+              + _8q2 * q1q1 + _8q2 * q2q2 + _4q2 * az)
+        s3 = _FOUR * q1q1 * q3 - _2q1 * ax + _FOUR * q2q2 * q3 - _2q2 * ay
+        n2 = s0 * s0 + s1 * s1 + s2 * s2 + s3 * s3
+        if n2 > 0.0:
+            step = beta / np.sqrt(n2)
+            qdot0 -= step * s0
+            qdot1 -= step * s1
+            qdot2 -= step * s2
+            qdot3 -= step * s3
+    
+    # Integrate and renormalize
+    q0 += qdot0 * dt
+    q1 += qdot1 * dt
+    q2 += qdot2 * dt
+    q3 += qdot3 * dt
+    inv = _ONE / np.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+    
+    out = np.empty(4, dtype=np.float32)
+    out[0] = q0 * inv
+    out[1] = q1 * inv
+    out[2] = q2 * inv
+    out[3] = q3 * inv
+    return out
+
+
+if njit is not None:
+    madgwick_update = njit(float32[:](float32[:], float32, float32, float32, float32, float32, float32,
+                                      float32, float32),
+                           cache=True, fastmath=True)(_madgwick_update)
+else:
+    madgwick_update = _madgwick_update
+
+
+def initial_quaternion():
+    """
+    Identity orientation for starting the filter.
+    
+    Returns:
+        numpy.ndarray: Quaternion [1, 0, 0, 0] as float32
+    """
+    return np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+
+
+def quaternion_to_euler(q):
+    """
+    Convert a quaternion to roll, pitch and yaw.
+    
+    Args:
+        q: Unit quaternion [w, x, y, z]
+    
+    Returns:
+        tuple: (roll, pitch, yaw) in degrees
+    """
+    w, x, y, z = (float(v) for v in q)
+    roll = math.atan2(2.0 * (w * x + y * z), 1.0 - 2.0 * (x * x + y * y))
+    pitch = math.asin(max(-1.0, min(1.0, 2.0 * (w * y - z * x))))
+    yaw = math.atan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+    return math.degrees(roll), math.degrees(pitch), math.degrees(yaw)
@@ -5,11 +5,35 @@ MPU9250 IMU Test Suite
 Comprehensive testing of the MPU9250 9-axis inertial measurement unit
 including accelerometer, gyroscope, magnetometer, and temperature sensors.
 """
-import smbus
+import asyncio
+import ctypes
+import queue
+from smbus2 import i2c_msg
+import threading
 import time
 import struct
 import math
 
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from i2c_bus import get_bus
+from imu_fusion import initial_quaternion, madgwick_update, quaternion_to_euler
+
+# Madgwick filter gain
+MADGWICK_BETA = np.float32(0.1)
+
+# Target rate of the steady-state fusion loop, and how often it reports
+FUSION_RATE_HZ = 300
+FUSION_REPORT_EVERY = 60
+
+# Samples compared by the movement check (one second at the 5 Hz test rate)
+MOVEMENT_WINDOW = 5
+
+# Movement thresholds, squared so the check needs no square roots
+ACCEL_THRESHOLD_SQ = 0.1 * 0.1  # g
+GYRO_THRESHOLD_SQ = 10.0 * 10.0  # °/s
+
 class MPU9250:
     """
     MPU9250 9-axis inertial measurement unit driver.
@@ -45,6 +69,17 @@ class MPU9250:
     MAG_WHO_AM_I = 0x00
     MAG_CNTL1 = 0x0A
     MAG_XOUT_L = 0x03
+    MAG_ST2 = 0x09
+    
+    # Samples kept in the accel/gyro history ring buffer
+    HISTORY_SIZE = 1024
+    
+    # Gyro offset tracking: the device counts as still when the rotation
+    # rate and the deviation of |accel| from 1g stay below these limits
+    STILL_GYRO_THRESHOLD = 2.0    # °/s
+    STILL_ACCEL_TOLERANCE = 0.05  # g
+    STILL_TIMEOUT = 0.5           # s of stillness before the offset adapts
+    OFFSET_GAIN = 0.01            # EMA gain per still sample
     
     def __init__(self, bus_num=1, address=0x68):
         """
@@ -54,14 +89,60 @@ class MPU9250:
             bus_num: I2C bus number (default: 1)
             address: I2C device address (default: 0x68)
         """
-        self.bus = smbus.SMBus(bus_num)
+        self.bus = get_bus(bus_num)  # Shared with other drivers on this bus
         self.address = address
         self.mag_address = 0x0C  # Magnetometer address
         
         # Scale factors
-        self.accel_scale = 16384.0  # ±2g
-        self.gyro_scale = 131.0     # ±250°/s
+        self.accel_scale = np.float32(16384.0)  # ±2g
+        self.gyro_scale = np.float32(131.0)     # ±250°/s
+        self.temp_scale = np.float32(333.87)    # LSB/°C, offset 21°C
+        
+        # Register decoding: MPU9250 data is big-endian, AK8963 little-endian
+        self._accel_dtype = np.dtype('>i2')
+        self._gyro_dtype = np.dtype('>i2')
+        self._mag_dtype = np.dtype('<i2')
+        self._inv_accel = np.float32(1.0 / self.accel_scale)
+        self._inv_gyro = np.float32(1.0 / self.gyro_scale)
+        self._inv_temp = np.float32(1.0 / self.temp_scale)
+        
+        # Fused burst read: the messages are built once and the read message
+        # fills _rxbuf in place, so a sample allocates no byte buffers
+        self._rxbuf = bytearray(14)
+        self._burst_struct = struct.Struct('>7h')
+        burst_read = i2c_msg.read(address, len(self._rxbuf))
+        burst_read.buf = (ctypes.c_char * len(self._rxbuf)).from_buffer(self._rxbuf)
+        self._burst_msgs = (i2c_msg.write(address, [self.ACCEL_XOUT_H]), burst_read)
         
+        # Sample history, one (x, y, z) row per sample
+        self._hist_accel = np.empty((self.HISTORY_SIZE, 3), dtype=np.float32)
+        self._hist_gyro = np.empty((self.HISTORY_SIZE, 3), dtype=np.float32)
+        self._hist_idx = 0
+        
+        # Gyro bias estimate in °/s, subtracted from calibrated readings
+        self.gyro_bias = np.zeros(3, dtype=np.float32)
+        self._still_since = None
+        
+    def _read_block(self, address, register, length):
+        """
+        Read consecutive registers in one combined I2C transaction.
+        
+        A register write and a repeated-start read are issued together via
+        I2C_RDWR, avoiding the SMBus block-read path and its STOP/START.
+        
+        Args:
+            address: I2C device address
+            register: First register to read
+            length: Number of bytes
+        
+        Returns:
+            list: Register values, as read_i2c_block_data returns them
+        """
+        write = i2c_msg.write(address, [register])
+        read = i2c_msg.read(address, length)
+        self.bus.i2c_rdwr(write, read)
+        return list(read)
+    
     def wake_up(self):
         """
         Wake up the MPU9250 from sleep mode.
@@ -144,14 +225,12 @@ class MPU9250:
         """
         try:
             # Read 6 bytes starting from ACCEL_XOUT_H
-            data = self.bus.read_i2c_block_data(self.address, self.ACCEL_XOUT_H, 6)
+            data = self._read_block(self.address, self.ACCEL_XOUT_H, 6)
             
-            # Convert to signed 16-bit values
-            accel_x = struct.unpack('>h', bytes(data[0:2]))[0] / self.accel_scale
-            accel_y = struct.unpack('>h', bytes(data[2:4]))[0] / self.accel_scale
-            accel_z = struct.unpack('>h', bytes(data[4:6]))[0] / self.accel_scale
+            # Convert all three signed 16-bit values at once
+            arr = np.frombuffer(bytes(data), dtype=self._accel_dtype) * self._inv_accel
             
-            return accel_x, accel_y, accel_z
+            return float(arr[0]), float(arr[1]), float(arr[2])
         except Exception as e:
             print(f"❌ Failed to read accelerometer: {e}")
             return None, None, None
@@ -165,14 +244,12 @@ class MPU9250:
         """
         try:
             # Read 6 bytes starting from GYRO_XOUT_H
-            data = self.bus.read_i2c_block_data(self.address, self.GYRO_XOUT_H, 6)
+            data = self._read_block(self.address, self.GYRO_XOUT_H, 6)
             
-            # Convert to signed 16-bit values
-            gyro_x = struct.unpack('>h', bytes(data[0:2]))[0] / self.gyro_scale
-            gyro_y = struct.unpack('>h', bytes(data[2:4]))[0] / self.gyro_scale
-            gyro_z = struct.unpack('>h', bytes(data[4:6]))[0] / self.gyro_scale
+            # Convert all three signed 16-bit values at once
+            arr = np.frombuffer(bytes(data), dtype=self._gyro_dtype) * self._inv_gyro
             
-            return gyro_x, gyro_y, gyro_z
+            return float(arr[0]), float(arr[1]), float(arr[2])
         except Exception as e:
             print(f"❌ Failed to read gyroscope: {e}")
             return None, None, None
@@ -186,16 +263,34 @@ class MPU9250:
         """
         try:
             # Read 2 bytes starting from TEMP_OUT_H
-            data = self.bus.read_i2c_block_data(self.address, self.TEMP_OUT_H, 2)
+            data = self._read_block(self.address, self.TEMP_OUT_H, 2)
             temp_raw = struct.unpack('>h', bytes(data))[0]
             
             # Convert to Celsius
-            temp_c = (temp_raw / 333.87) + 21.0
+            temp_c = float(temp_raw * self._inv_temp) + 21.0
             return temp_c
         except Exception as e:
             print(f"❌ Failed to read temperature: {e}")
             return None
     
+    def read_accel_gyro_temp(self):
+        """
+        Read accelerometer, temperature and gyroscope in one burst.
+        
+        ACCEL_XOUT_H (0x3B) through GYRO_ZOUT_L (0x48) are 14 contiguous
+        registers, so the auto-incrementing register pointer returns all of
+        them in a single I2C transaction.
+        
+        Returns:
+            tuple: Raw signed values (ax, ay, az, temp, gx, gy, gz), or None on error
+        """
+        try:
+            self.bus.i2c_rdwr(*self._burst_msgs)
+            return self._burst_struct.unpack_from(self._rxbuf)
+        except Exception as e:
+            print(f"❌ Failed to read accel/gyro/temp: {e}")
+            return None
+    
     def init_magnetometer(self):
         """
         Initialize AK8963 magnetometer for continuous measurement.
@@ -231,25 +326,244 @@ class MPU9250:
             tuple: (mag_x, mag_y, mag_z) in raw units, or (None, None, None) on error
         """
         try:
-            # Read 6 bytes starting from MAG_XOUT_L
-            data = self.bus.read_i2c_block_data(self.mag_address, self.MAG_XOUT_L, 6)
+            # Read MAG_XOUT_L through ST2; reading ST2 ends the measurement
+            # and releases the data registers for the next sample
+            data = self._read_block(self.mag_address, self.MAG_XOUT_L, 7)
             
             # Convert to signed 16-bit values (little endian for AK8963)
-            mag_x = struct.unpack('<h', bytes(data[0:2]))[0]
-            mag_y = struct.unpack('<h', bytes(data[2:4]))[0]
-            mag_z = struct.unpack('<h', bytes(data[4:6]))[0]
+            arr = np.frombuffer(bytes(data[:6]), dtype=self._mag_dtype)
             
-            return mag_x, mag_y, mag_z
+            return int(arr[0]), int(arr[1]), int(arr[2])
         except Exception as e:
             print(f"❌ Failed to read magnetometer: {e}")
             return None, None, None
     
+    def update_gyro_offset(self, gyro, accel):
+        """
+        Track the gyroscope bias while the device is still.
+        
+        Follows the offset update of the Fusion library: once the rotation
+        rate is small and |accel| is close to 1g for STILL_TIMEOUT seconds,
+        every further still sample pulls the bias towards the raw reading
+        with an exponential moving average.
+        
+        Args:
+            gyro: Raw angular rate (x, y, z) in degrees/second
+            accel: Acceleration (x, y, z) in g
+        
+        Returns:
+            numpy.ndarray: Bias-corrected angular rate in degrees/second
+        """
+        g = np.asarray(gyro, dtype=np.float32)
+        still = (np.linalg.norm(g - self.gyro_bias) < self.STILL_GYRO_THRESHOLD and
+                 abs(np.linalg.norm(accel) - 1.0) < self.STILL_ACCEL_TOLERANCE)
+        
+        if not still:
+            self._still_since = None
+        else:
+            now = time.monotonic()
+            if self._still_since is None:
+                self._still_since = now
+            elif now - self._still_since > self.STILL_TIMEOUT:
+                self.gyro_bias += self.OFFSET_GAIN * (g - self.gyro_bias)
+        
+        return g - self.gyro_bias
+    
+    def read_gyroscope_calibrated(self):
+        """
+        Read 3-axis gyroscope data with the tracked bias removed.
+        
+        Returns:
+            tuple: (gyro_x, gyro_y, gyro_z) in degrees/second, or (None, None, None) on error
+        """
+        raw = self.read_accel_gyro_temp()
+        if raw is None:
+            return None, None, None
+        
+        accel = np.array(raw[0:3], dtype=np.float32) * self._inv_accel
+        gyro = np.array(raw[4:7], dtype=np.float32) * self._inv_gyro
+        gx, gy, gz = self.update_gyro_offset(gyro, accel)
+        return float(gx), float(gy), float(gz)
+    
+    def append_sample(self, ax, ay, az, gx, gy, gz):
+        """
+        Store a scaled accelerometer and gyroscope sample in the history.
+        
+        Args:
+            ax, ay, az: Acceleration in g
+            gx, gy, gz: Angular rate in degrees/second
+        """
+        i = self._hist_idx % self.HISTORY_SIZE
+        self._hist_accel[i] = (ax, ay, az)
+        self._hist_gyro[i] = (gx, gy, gz)
+        self._hist_idx += 1
+    
+    def history_window(self, n):
+        """
+        Most recent history samples, oldest first.
+        
+        Args:
+            n: Number of samples wanted; fewer are returned if not yet recorded
+        
+        Returns:
+            tuple: (accel, gyro) float32 arrays of shape (k, 3), k <= n
+        """
+        n = min(n, self._hist_idx, self.HISTORY_SIZE)
+        idx = np.arange(self._hist_idx - n, self._hist_idx) % self.HISTORY_SIZE
+        return self._hist_accel[idx], self._hist_gyro[idx]
+    
     def close(self):
-        """Close I2C bus"""
-        try:
-            self.bus.close()
-        except:
-            pass
+        """Release the driver; the shared I2C bus stays open until exit"""
+        pass
+
+class AsyncMPU9250:
+    """
+    Asyncio wrapper around MPU9250.
+    
+    The blocking smbus calls run on a dedicated single-thread executor, so
+    the event loop stays free for other sensors while the kernel waits on
+    the I2C controller, and bus transactions keep their submission order.
+    """
+    
+    def __init__(self, bus_num=1, address=0x68):
+        """
+        Initialize async MPU9250 interface.
+        
+        Args:
+            bus_num: I2C bus number (default: 1)
+            address: I2C device address (default: 0x68)
+        """
+        self._sync = MPU9250(bus_num=bus_num, address=address)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mpu9250")
+        
+        self.accel_scale = self._sync.accel_scale
+        self.gyro_scale = self._sync.gyro_scale
+    
+    async def _run(self, func, *args):
+        """Run a blocking driver call on the I2C executor."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+    
+    async def read_who_am_i(self):
+        return await self._run(self._sync.read_who_am_i)
+    
+    async def init_device(self):
+        return await self._run(self._sync.init_device)
+    
+    async def init_magnetometer(self):
+        return await self._run(self._sync.init_magnetometer)
+    
+    async def read_accelerometer(self):
+        return await self._run(self._sync.read_accelerometer)
+    
+    async def read_gyroscope(self):
+        return await self._run(self._sync.read_gyroscope)
+    
+    async def read_temperature(self):
+        return await self._run(self._sync.read_temperature)
+    
+    async def read_accel_gyro_temp(self):
+        return await self._run(self._sync.read_accel_gyro_temp)
+    
+    async def read_magnetometer(self):
+        return await self._run(self._sync.read_magnetometer)
+    
+    async def read_gyroscope_calibrated(self):
+        return await self._run(self._sync.read_gyroscope_calibrated)
+    
+    def update_gyro_offset(self, gyro, accel):
+        return self._sync.update_gyro_offset(gyro, accel)
+    
+    def append_sample(self, ax, ay, az, gx, gy, gz):
+        self._sync.append_sample(ax, ay, az, gx, gy, gz)
+    
+    def history_window(self, n):
+        return self._sync.history_window(n)
+    
+    async def close(self):
+        """Release the driver and stop the executor"""
+        await self._run(self._sync.close)
+        self._executor.shutdown(wait=True)
+
+def _format_reading(record):
+    """
+    Format one test_mpu9250_complete sample.
+    
+    Args:
+        record: (index, raw accel/temp/gyro tuple or None, magnetometer tuple or None,
+                 accel, gyro and temperature reciprocal scales)
+    
+    Returns:
+        str: Printable block for the sample
+    """
+    i, raw, mag, inv_accel, inv_gyro, inv_temp = record
+    lines = [f"--- Reading {i+1}/10 ---"]
+    if raw is not None:
+        ax, ay, az = (v * inv_accel for v in raw[0:3])
+        gx, gy, gz = (v * inv_gyro for v in raw[4:7])
+        temp = (raw[3] * inv_temp) + 21.0
+        lines.append(f"Accelerometer: X={ax:6.3f}g, Y={ay:6.3f}g, Z={az:6.3f}g")
+        lines.append(f"Gyroscope:     X={gx:6.1f}°/s, Y={gy:6.1f}°/s, Z={gz:6.1f}°/s")
+        lines.append(f"Temperature:   {temp:5.1f}°C")
+    if mag is not None and mag[0] is not None:
+        mx, my, mz = mag
+        lines.append(f"Magnetometer:  X={mx:6.0f}, Y={my:6.0f}, Z={mz:6.0f}")
+    lines.append("")
+    return "\n".join(lines)
+
+def poll_fusion(mpu, seconds, report_every=FUSION_REPORT_EVERY, on_report=None):
+    """
+    Steady-state IMU polling and Madgwick fusion at FUSION_RATE_HZ.
+    
+    Each iteration is one burst read, an in-place decode and one compiled
+    filter step; Python objects are only built for the snapshot handed to
+    on_report every report_every samples.
+    
+    Args:
+        mpu: Initialized MPU9250
+        seconds: How long to poll
+        report_every: Samples between snapshots
+        on_report: Called with a snapshot dict (default: print it)
+    
+    Returns:
+        tuple: (samples processed, final quaternion)
+    """
+    if on_report is None:
+        on_report = print
+    
+    q = initial_quaternion()
+    gyro_to_rad = np.float32(math.radians(1.0)) / mpu.gyro_scale
+    period = 1.0 / FUSION_RATE_HZ
+    samples = 0
+    
+    # Hot-loop names bound as locals
+    read = mpu.read_accel_gyro_temp
+    update = madgwick_update
+    beta = MADGWICK_BETA
+    clock = time.perf_counter
+    sleep = time.sleep
+    
+    start = last = clock()
+    deadline = start + seconds
+    while last < deadline:
+        raw = read()
+        now = clock()
+        if raw is not None:
+            # The filter normalizes acceleration, so raw counts need no scaling
+            ax, ay, az, _, gx, gy, gz = raw
+            q = update(q, gx * gyro_to_rad, gy * gyro_to_rad, gz * gyro_to_rad,
+                       float(ax), float(ay), float(az), beta, now - last)
+            samples += 1
+            if samples % report_every == 0:
+                on_report({'samples': samples, 'rate_hz': samples / (now - start),
+                           'quaternion': q.tolist()})
+        last = now
+        
+        # Sleep off whatever is left of the sample period
+        remaining = period - (clock() - now)
+        if remaining > 0:
+            sleep(remaining)
+    
+    return samples, q
 
 def test_mpu9250_complete():
     """
@@ -290,32 +604,35 @@ def test_mpu9250_complete():
         print("4. Reading sensor data...")
         print()
         
-        for i in range(10):
-            print(f"--- Reading {i+1}/10 ---")
-            
-            # Read accelerometer
-            ax, ay, az = mpu.read_accelerometer()
-            if ax is not None:
-                print(f"Accelerometer: X={ax:6.3f}g, Y={ay:6.3f}g, Z={az:6.3f}g")
-            
-            # Read gyroscope
-            gx, gy, gz = mpu.read_gyroscope()
-            if gx is not None:
-                print(f"Gyroscope:     X={gx:6.1f}°/s, Y={gy:6.1f}°/s, Z={gz:6.1f}°/s")
-            
-            # Read temperature
-            temp = mpu.read_temperature()
-            if temp is not None:
-                print(f"Temperature:   {temp:5.1f}°C")
-            
-            # Read magnetometer if available
-            if mag_ok:
-                mx, my, mz = mpu.read_magnetometer()
-                if mx is not None:
-                    print(f"Magnetometer:  X={mx:6.0f}, Y={my:6.0f}, Z={mz:6.0f}")
+        # A producer thread does the bus reads and pacing; this thread
+        # formats and prints, so terminal output never delays a read
+        samples = queue.Queue()
+        
+        def producer():
+            # Hot-loop names bound as locals
+            read_burst = mpu.read_accel_gyro_temp
+            read_mag = mpu.read_magnetometer
+            put = samples.put
+            sleep = time.sleep
+            inv_accel = mpu._inv_accel
+            inv_gyro = mpu._inv_gyro
+            inv_temp = mpu._inv_temp
             
-            print()
-            time.sleep(0.5)
+            for i in range(10):
+                # Read accelerometer, temperature and gyroscope in one burst
+                raw = read_burst()
+                
+                # Read magnetometer if available
+                mag = read_mag() if mag_ok else None
+                
+                put((i, raw, mag, inv_accel, inv_gyro, inv_temp))
+                sleep(0.5)
+        
+        reader = threading.Thread(target=producer, daemon=True)
+        reader.start()
+        for _ in range(10):
+            print(_format_reading(samples.get(timeout=5.0)))
+        reader.join()
         
         print("✅ MPU9250 test completed successfully!")
         return True
@@ -333,6 +650,15 @@ def test_movement_detection():
     Monitors sensor readings for 10 seconds and detects movement based on
     acceleration changes and gyroscope rotation rates.
     
+    Returns:
+        bool: True if test completes successfully, False otherwise
+    """
+    return asyncio.run(_movement_detection())
+
+async def _movement_detection():
+    """
+    Movement detection loop, with I2C reads awaited on the driver's executor.
+    
     Returns:
         bool: True if test completes successfully, False otherwise
     """
@@ -340,35 +666,70 @@ def test_movement_detection():
     print("Move the robot around for 10 seconds...")
     print()
     
-    mpu = MPU9250()
+    mpu = AsyncMPU9250()
     
     try:
-        if not mpu.read_who_am_i() or not mpu.init_device():
+        if not await mpu.read_who_am_i() or not await mpu.init_device():
             return False
         
         # Baseline reading
-        time.sleep(1)
-        ax0, ay0, az0 = mpu.read_accelerometer()
-        gx0, gy0, gz0 = mpu.read_gyroscope()
+        await asyncio.sleep(1)
+        baseline = await mpu.read_accel_gyro_temp()
+        if baseline is None:
+            print("❌ Failed to read baseline")
+            return False
+        accel0 = np.asarray(baseline[0:3], dtype=np.float32) / mpu.accel_scale
         
         print("Monitoring movement (10 seconds)...")
-        start_time = time.time()
         
-        while time.time() - start_time < 10:
-            ax, ay, az = mpu.read_accelerometer()
-            gx, gy, gz = mpu.read_gyroscope()
+        # Hot-loop names and scale constants bound as locals
+        read = mpu.read_accel_gyro_temp
+        update_offset = mpu.update_gyro_offset
+        append_sample = mpu.append_sample
+        history_window = mpu.history_window
+        update = madgwick_update
+        to_euler = quaternion_to_euler
+        radians = math.radians
+        sqrt = math.sqrt
+        mono = time.monotonic_ns
+        sleep = asyncio.sleep
+        inv_accel = np.float32(1.0) / mpu.accel_scale
+        inv_gyro = np.float32(1.0) / mpu.gyro_scale
+        beta = MADGWICK_BETA
+        
+        # Integer nanosecond deadline on the monotonic clock
+        last_ns = mono()
+        deadline = last_ns + 10_000_000_000
+        q = initial_quaternion()
+        
+        while mono() < deadline:
+            raw = await read()
+            now_ns = mono()
+            dt, last_ns = (now_ns - last_ns) * 1e-9, now_ns
             
-            if ax is not None and ax0 is not None:
-                # Calculate movement magnitude
-                accel_delta = math.sqrt((ax-ax0)**2 + (ay-ay0)**2 + (az-az0)**2)
-                gyro_delta = math.sqrt(gx**2 + gy**2 + gz**2)
+            if raw is not None:
+                ax, ay, az = raw[0] * inv_accel, raw[1] * inv_accel, raw[2] * inv_accel
+                gx, gy, gz = raw[4] * inv_gyro, raw[5] * inv_gyro, raw[6] * inv_gyro
+                gx, gy, gz = (float(v) for v in update_offset((gx, gy, gz), (ax, ay, az)))
+                
+                # Orientation estimate; the filter takes gyro rates in rad/s
+                q = update(q, radians(gx), radians(gy), radians(gz), ax, ay, az, beta, dt)
+                roll, pitch, yaw = to_euler(q)
                 
-                movement_detected = accel_delta > 0.1 or gyro_delta > 10
+                # Calculate movement magnitude: largest displacement of recent
+                # accel samples from the baseline, and the current rotation rate
+                append_sample(ax, ay, az, gx, gy, gz)
+                accel_win, _ = history_window(MOVEMENT_WINDOW)
+                da2 = float(((accel_win - accel0) ** 2).sum(1).max())
+                dg2 = gx * gx + gy * gy + gz * gz
+                
+                movement_detected = da2 > ACCEL_THRESHOLD_SQ or dg2 > GYRO_THRESHOLD_SQ
                 
                 status = "MOVING" if movement_detected else "STILL"
-                print(f"{status}: Accel Δ={accel_delta:5.3f}g, Gyro={gyro_delta:5.1f}°/s")
+                print(f"{status}: Accel Δ={sqrt(da2):5.3f}g, Gyro={sqrt(dg2):5.1f}°/s, "
+                      f"Roll={roll:6.1f}°, Pitch={pitch:6.1f}°, Yaw={yaw:6.1f}°")
             
-            time.sleep(0.2)
+            await sleep(0.2)
         
         print("✅ Movement detection test completed!")
         return True
@@ -376,6 +737,42 @@ def test_movement_detection():
     except Exception as e:
         print(f"❌ Movement test failed: {e}")
         return False
+    finally:
+        await mpu.close()
+
+def test_fusion_loop():
+    """
+    Run the steady-state fusion loop for 5 seconds and report its rate.
+    
+    Returns:
+        bool: True if the loop reached at least half the target rate, False otherwise
+    """
+    print("=== Fusion Loop Test ===")
+    print()
+    
+    mpu = MPU9250()
+    
+    try:
+        if not mpu.read_who_am_i() or not mpu.init_device():
+            return False
+        
+        seconds = 5.0
+        samples, q = poll_fusion(mpu, seconds)
+        rate = samples / seconds
+        roll, pitch, yaw = quaternion_to_euler(q)
+        print(f"Fused {samples} samples at {rate:.0f} Hz (target {FUSION_RATE_HZ} Hz)")
+        print(f"Orientation: Roll={roll:6.1f}°, Pitch={pitch:6.1f}°, Yaw={yaw:6.1f}°")
+        
+        if rate < FUSION_RATE_HZ / 2:
+            print("❌ Fusion loop too slow")
+            return False
+        
+        print("✅ Fusion loop test completed!")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Fusion loop test failed: {e}")
+        return False
     finally:
         mpu.close()
 
@@ -394,10 +791,14 @@ if __name__ == "__main__":
         success2 = test_movement_detection()
     else:
         success2 = False
+    print()
+    
+    # Run steady-state fusion loop test
+    success3 = test_fusion_loop() if success1 else False
     
     print()
     print("=" * 40)
-    if success1 and success2:
+    if success1 and success2 and success3:
         print("🎉 ALL TESTS PASSED! MPU9250 is working perfectly!")
     else:
         print("❌ Some tests failed. Check the output above.")
@@ -7,15 +7,25 @@ Tests basic servo positioning and movement patterns.
 
 Requirements:
     sudo apt update
-    sudo apt install python3-gpiozero
+    sudo apt install python3-gpiozero python3-pigpio pigpio
+    sudo systemctl enable --now pigpiod
 
 Hardware:
     Connect servo to BCM pin 12 (GPIO12) with common wire to GND.
 """
 
-from gpiozero import Servo
+import numpy as np
+from gpiozero import Device, Servo
 from time import sleep
 
+# Hardware-timed PWM from the pigpio daemon; software PWM jitters and
+# costs CPU while holding a position
+try:
+    from gpiozero.pins.pigpio import PiGPIOFactory
+    Device.pin_factory = PiGPIOFactory()
+except (ImportError, OSError) as e:
+    print(f"⚠️  pigpio unavailable, using default pin factory: {e}")
+
 
 SERVO_PIN = 12
 MIN_PULSE_WIDTH = 0.0005
@@ -47,6 +57,12 @@ class ServoTester:
         self.servo = Servo(pin, min_pulse_width=min_pw, max_pulse_width=max_pw)
         self.pin = pin
         
+        # One full sweep cycle (-1 -> 1 -> -1 in 0.05 steps), computed once
+        self._sweep_values = np.concatenate([
+            np.arange(-100, 101, 5, dtype=np.float32),
+            np.arange(100, -101, -5, dtype=np.float32),
+        ]) * 0.01
+        
     def test_basic_positions(self):
         """
         Test basic servo positions with delays.
@@ -81,13 +97,10 @@ class ServoTester:
         try:
             print(f"Starting sweep pattern on pin {self.pin}")
             
+            sweep_values = self._sweep_values.tolist()
             while True:
-                for position in range(-100, 101, 5):
-                    self.servo.value = position / 100.0
-                    sleep(0.05)
-                    
-                for position in range(100, -101, -5):
-                    self.servo.value = position / 100.0
+                for value in sweep_values:
+                    self.servo.value = value
                     sleep(0.05)
                     
         except KeyboardInterrupt: